@@ -11,3 +11,7 @@ class AnnouncementsConfig(AppConfig):
     name = 'troop89.announcements'
     label = 'announcements'
     verbose_name = 'Troop Announcements'
+
+    def ready(self):
+        # Register signal receivers
+        from . import signals  # noqa: F401
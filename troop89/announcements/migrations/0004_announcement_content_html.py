@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-17 17:20
+
+from django.db import migrations, models
+from markdownx.utils import markdownify
+
+
+def render_contents(apps, schema_editor):
+    Announcement = apps.get_model('announcements', 'Announcement')
+    announcements = list(Announcement.objects.only('content'))
+    for announcement in announcements:
+        announcement.content_html = markdownify(announcement.content)
+    Announcement.objects.bulk_update(announcements, ['content_html'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0003_announcement_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_contents, migrations.RunPython.noop),
+    ]
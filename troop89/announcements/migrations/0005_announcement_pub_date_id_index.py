@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-17 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0004_announcement_content_html'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['pub_date', 'id'], name='announcemen_pub_dat_baebde_idx'),
+        ),
+    ]
@@ -9,10 +9,9 @@ import calendar
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
-from django.utils.functional import cached_property
 from markdownx.models import MarkdownxField
-from markdownx.utils import markdownify
 
+from troop89.rendered_markdown.models import RenderedMarkdownModel
 from troop89.trooporg.models import Member
 
 
@@ -23,7 +22,7 @@ class AnnouncementQuerySet(models.QuerySet):
         return self.filter(pub_date__lte=timezone.now())
 
 
-class Announcement(models.Model):
+class Announcement(RenderedMarkdownModel):
     """An announcement posted on the site's main page."""
     title = models.CharField(max_length=120, blank=False)
 
@@ -37,13 +36,24 @@ class Announcement(models.Model):
 
     content = MarkdownxField(verbose_name='Post Content')
 
+    content_html = models.TextField(blank=True, editable=False)
+
     author = models.ForeignKey(Member, on_delete=models.PROTECT)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     objects = AnnouncementQuerySet.as_manager()
 
+    rendered_markdown_fields = {'content': 'content_html'}
+
     class Meta:
         ordering = ('-pub_date',)
         get_latest_by = 'pub_date'
+        indexes = [
+            # Supports keyset pagination (see troop89.pagination) and lookups
+            # of the next scheduled announcement
+            models.Index(fields=['pub_date', 'id']),
+        ]
 
     def __str__(self):
         return f'{self.title} ({self.pub_date.date()})'
@@ -52,10 +62,10 @@ class Announcement(models.Model):
         day = timezone.localdate(self.pub_date)
         return reverse('announcements:announcement-detail', args=(day.year, day.month, day.day, self.slug))
 
-    @cached_property
+    @property
     def formatted_content(self):
-        """Render this announcement markdown content into HTML."""
-        return markdownify(self.content)
+        """Return this announcement's markdown content rendered into HTML."""
+        return self.get_rendered_markdown('content')
 
     @property
     def breadcrumbs(self):
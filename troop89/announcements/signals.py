@@ -0,0 +1,30 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Signal receivers that keep the announcements app's caches consistent with the
+database.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import utils
+from .models import Announcement
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def touch_announcements_last_modified(sender, **kwargs):
+    """Record the time of the latest change to any announcement."""
+    utils.touch_announcements_last_modified()
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def forget_next_publication_date(sender, **kwargs):
+    """Discard the cached date of the next scheduled announcement."""
+    utils.forget_next_publication_date()
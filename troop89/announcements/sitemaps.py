@@ -7,11 +7,25 @@
 from django.contrib.sitemaps import Sitemap
 
 from .models import Announcement
+from .utils import announcements_last_modified, latest_publication_date
 
 
 class AnnouncementSitemap(Sitemap):
     changefreq = "never"
     priority = 0.5
+    limit = 1000
 
     def items(self):
-        return Announcement.objects.published()
+        # Only fetch the fields needed to build each url
+        return Announcement.objects.published().only('slug', 'pub_date', 'updated_at').order_by('pk')
+
+    def lastmod(self, item: Announcement):
+        # Scheduled announcements are not visible until their publication date
+        return max(item.updated_at, item.pub_date)
+
+    def get_latest_lastmod(self):
+        last_modified = announcements_last_modified()
+        last_published = latest_publication_date()
+        if last_modified is None or last_published is None:
+            return None
+        return max(last_modified, last_published)
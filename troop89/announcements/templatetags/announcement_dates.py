@@ -6,7 +6,7 @@
 
 from django import template
 
-from ..models import Announcement
+from .. import utils
 
 register = template.Library()
 
@@ -14,5 +14,14 @@ register = template.Library()
 @register.inclusion_tag('announcements/includes/archive_year_month_listing.html')
 def render_month_links():
     return {
-        'announcement_dates': Announcement.objects.published().dates('pub_date', 'month', order='ASC'),
+        'announcement_dates': utils.announcement_months(),
     }
+
+
+@register.simple_tag
+def announcements_version():
+    """
+    Return a string that changes whenever the published announcements do, for
+    use as a cache key for template fragments that depend on them.
+    """
+    return utils.published_announcements_version()
@@ -0,0 +1,165 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from troop89.pagination import encode_cursor
+from troop89.trooporg.models import Member
+from . import utils
+from .models import Announcement
+
+
+class AnnouncementMonthsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = Member.objects.create(username='author', first_name='A', last_name='Uthor')
+        self.now = timezone.now()
+        self.create('past', self.now - datetime.timedelta(days=60))
+
+    def create(self, slug, pub_date):
+        return Announcement.objects.create(
+            title=slug.title(),
+            slug=slug,
+            pub_date=pub_date,
+            content='',
+            author=self.author,
+        )
+
+    def local_month(self, moment):
+        return timezone.localdate(moment).replace(day=1)
+
+    def test_months_cached(self):
+        utils.announcement_months()
+        with self.assertNumQueries(0):
+            months = utils.announcement_months()
+        self.assertListEqual(months, [self.local_month(self.now - datetime.timedelta(days=60))])
+
+    def test_version_loaded_in_one_query(self):
+        with self.assertNumQueries(1):
+            utils.published_announcements_version()
+        with self.assertNumQueries(0):
+            utils.published_announcements_version()
+
+    def test_cache_invalidated_on_announcement_change(self):
+        utils.announcement_months()
+        self.create('recent', self.now - datetime.timedelta(minutes=1))
+
+        self.assertEqual(len(utils.announcement_months()), 2)
+
+    def test_scheduled_announcement_published(self):
+        pub_date = self.now + datetime.timedelta(days=60)
+        self.create('scheduled', pub_date)
+        self.assertEqual(len(utils.announcement_months()), 1)
+        self.assertEqual(utils.next_publication_date(), pub_date)
+
+        later = pub_date + datetime.timedelta(minutes=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(utils.announcement_months()[-1], self.local_month(pub_date))
+            self.assertIsNone(utils.next_publication_date())
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class AnnouncementArchiveCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = Member.objects.create(username='author', first_name='A', last_name='Uthor')
+        self.now = timezone.now()
+        for i in range(6):
+            Announcement.objects.create(
+                title=f'Meeting {i}',
+                slug=f'meeting-{i}',
+                pub_date=self.now - datetime.timedelta(days=i + 1),
+                content='',
+                author=self.author,
+            )
+        self.url = reverse('announcements:announcement-index')
+
+    def test_page_cached_for_visitors(self):
+        self.assertContains(self.client.get(self.url), 'Meeting 0')
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(self.url), 'Meeting 0')
+
+    def test_pages_cached_separately(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {'page': 2})
+        self.assertContains(response, 'Meeting 5')
+        self.assertNotContains(response, 'Meeting 0')
+
+    def test_scheduled_announcement_published(self):
+        pub_date = self.now + datetime.timedelta(hours=1)
+        Announcement.objects.create(
+            title='Scheduled',
+            slug='scheduled',
+            pub_date=pub_date,
+            content='',
+            author=self.author,
+        )
+        self.assertNotContains(self.client.get(self.url), 'Scheduled')
+
+        with mock.patch('django.utils.timezone.now', return_value=pub_date + datetime.timedelta(minutes=1)):
+            self.assertContains(self.client.get(self.url), 'Scheduled')
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class AnnouncementKeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        author = Member.objects.create(username='author', first_name='A', last_name='Uthor')
+        pub_date = timezone.now() - datetime.timedelta(days=1)
+        # Announcements with the same date are ordered by their primary key
+        self.announcements = [
+            Announcement.objects.create(
+                title=f'Meeting {i}',
+                slug=f'meeting-{i}',
+                pub_date=pub_date - datetime.timedelta(hours=i // 2),
+                content='',
+                author=author,
+            )
+            for i in range(7)
+        ]
+        self.url = reverse('announcements:announcement-index')
+
+    def titles(self, response):
+        return [announcement.title for announcement in response.context['announcements']]
+
+    def test_walk_archive_by_cursor(self):
+        first = self.client.get(self.url)
+        self.assertListEqual(self.titles(first), ['Meeting 1', 'Meeting 0', 'Meeting 3', 'Meeting 2', 'Meeting 5'])
+
+        second = self.client.get(self.url, {'after': first.context['page_obj'].next_cursor})
+        self.assertListEqual(self.titles(second), ['Meeting 4', 'Meeting 6'])
+        self.assertFalse(second.context['page_obj'].has_next())
+
+        previous = self.client.get(self.url, {'before': second.context['page_obj'].previous_cursor})
+        self.assertListEqual(self.titles(previous), self.titles(first))
+        self.assertFalse(previous.context['page_obj'].has_previous())
+
+    def test_cursor_page_does_not_count(self):
+        cursor = self.client.get(self.url).context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'after': cursor})
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'after': 'nonsense'}).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {'after': '999999999999999999999.1'}).status_code, 404)
+
+    def test_unknown_cursor(self):
+        announcement = self.announcements[3]
+        cursor = encode_cursor(announcement.pub_date + datetime.timedelta(seconds=1), announcement.pk)
+        self.assertEqual(self.client.get(self.url, {'after': cursor}).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {'before': cursor}).status_code, 404)
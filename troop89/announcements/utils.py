@@ -0,0 +1,119 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from datetime import date, datetime
+from typing import List, Optional
+
+from django.core.cache import cache
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from troop89.cache import get_or_compute
+from .models import Announcement
+
+LAST_MODIFIED_CACHE_KEY = 'announcements.last-modified'
+
+NEXT_PUBLICATION_CACHE_KEY = 'announcements.next-publication'
+
+LATEST_PUBLICATION_CACHE_KEY = 'announcements.latest-publication'
+
+MONTHS_CACHE_KEY = 'announcements.months'
+
+
+def announcements_last_modified() -> Optional[datetime]:
+    """
+    Return the last time that any announcement was changed, or None if there
+    are no announcements.
+
+    The time is cached and refreshed by ``troop89.announcements.signals``.
+    Note that scheduled announcements becoming published is *not* considered
+    to be a change.
+    """
+    # The time is wrapped in a tuple so that a missing time can be cached
+    cached = cache.get(LAST_MODIFIED_CACHE_KEY)
+    if cached is None:
+        cached = (Announcement.objects.aggregate(Max('updated_at'))['updated_at__max'],)
+        cache.set(LAST_MODIFIED_CACHE_KEY, cached, None)
+    return cached[0]
+
+
+def touch_announcements_last_modified():
+    """Record that the announcements have changed as of now."""
+    cache.set(LAST_MODIFIED_CACHE_KEY, (timezone.now(),), None)
+
+
+def next_publication_date() -> Optional[datetime]:
+    """
+    Return the publication date of the next scheduled announcement, or None
+    if no announcements are scheduled.
+
+    The date is cached until it passes, and is discarded by
+    ``troop89.announcements.signals`` whenever an announcement changes.
+    """
+    now = timezone.now()
+    # The date is wrapped in a tuple so that a missing date can be cached
+    cached = cache.get(NEXT_PUBLICATION_CACHE_KEY)
+    if cached is None or (cached[0] is not None and cached[0] <= now):
+        cached = (Announcement.objects.filter(pub_date__gt=now).aggregate(Min('pub_date'))['pub_date__min'],)
+        cache.set(NEXT_PUBLICATION_CACHE_KEY, cached, None)
+    return cached[0]
+
+
+def forget_next_publication_date():
+    """Discard the cached publication date of the next scheduled announcement."""
+    cache.delete(NEXT_PUBLICATION_CACHE_KEY)
+
+
+def published_announcements_version() -> str:
+    """
+    Return a string that changes whenever the published announcements do,
+    either because an announcement changed or because a scheduled
+    announcement was published.
+    """
+    if not cache.get_many([LAST_MODIFIED_CACHE_KEY, NEXT_PUBLICATION_CACHE_KEY]):
+        # Load both dates with a single query when neither is cached
+        now = timezone.now()
+        dates = Announcement.objects.aggregate(
+            last_modified=Max('updated_at'),
+            next_publication=Min('pub_date', filter=Q(pub_date__gt=now)),
+        )
+        cache.set_many({
+            LAST_MODIFIED_CACHE_KEY: (dates['last_modified'],),
+            NEXT_PUBLICATION_CACHE_KEY: (dates['next_publication'],),
+        }, None)
+    return f'{announcements_last_modified()}.{next_publication_date()}'
+
+
+def announcement_months() -> List[date]:
+    """
+    Return the first day of every month with a published announcement, in
+    ascending order.
+
+    The months are cached until an announcement changes or the next scheduled
+    announcement is published.
+    """
+    return get_or_compute(
+        MONTHS_CACHE_KEY,
+        lambda: list(Announcement.objects.published().dates('pub_date', 'month', order='ASC')),
+        timeout=None,
+        version=published_announcements_version(),
+    )
+
+
+def latest_publication_date() -> Optional[datetime]:
+    """
+    Return the publication date of the latest published announcement, or None
+    if no announcements have been published.
+
+    The date is cached until an announcement changes or the next scheduled
+    announcement is published.
+    """
+    return get_or_compute(
+        LATEST_PUBLICATION_CACHE_KEY,
+        lambda: Announcement.objects.published().aggregate(Max('pub_date'))['pub_date__max'],
+        timeout=None,
+        version=published_announcements_version(),
+    )
@@ -8,12 +8,29 @@ import calendar
 
 from django.db.models import Prefetch
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views.generic import DetailView, View, dates
 
+from troop89.cache import cache_public_page
 from troop89.json_ld.views import BreadcrumbJsonLdMixin
+from troop89.pagination import DateKeysetPaginationMixin
 from troop89.trooporg.models import Member
+from . import utils
 from .models import Announcement
 
+# Archive pages are replaced as soon as an announcement changes or a scheduled
+# announcement is published, so they may be cached for quite a while.
+ARCHIVE_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_archive_page(name: str):
+    return method_decorator(cache_public_page(
+        f'announcements.{name}',
+        timeout=ARCHIVE_CACHE_TIMEOUT,
+        get_version=utils.published_announcements_version,
+        vary_on_params=('page', 'after', 'before'),
+    ), name='dispatch')
+
 
 class AnnouncementViewMixin(BreadcrumbJsonLdMixin):
     model = Announcement
@@ -42,11 +59,13 @@ class AnnouncementViewMixin(BreadcrumbJsonLdMixin):
         return [("Announcements", reverse('announcements:announcement-index'))]
 
 
-class AnnouncementIndexView(AnnouncementViewMixin, dates.ArchiveIndexView):
+@_cache_archive_page('index')
+class AnnouncementIndexView(AnnouncementViewMixin, DateKeysetPaginationMixin, dates.ArchiveIndexView):
     paginate_by = 5
 
 
-class AnnouncementYearView(AnnouncementViewMixin, dates.YearArchiveView):
+@_cache_archive_page('year')
+class AnnouncementYearView(AnnouncementViewMixin, DateKeysetPaginationMixin, dates.YearArchiveView):
     make_object_list = True
     paginate_by = 5
 
@@ -60,7 +79,8 @@ class AnnouncementYearView(AnnouncementViewMixin, dates.YearArchiveView):
         return breadcrumbs
 
 
-class AnnouncementMonthView(AnnouncementViewMixin, dates.MonthArchiveView):
+@_cache_archive_page('month')
+class AnnouncementMonthView(AnnouncementViewMixin, DateKeysetPaginationMixin, dates.MonthArchiveView):
     paginate_by = 5
 
     def get_breadcrumbs(self):
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-17 17:20
+
+from django.db import migrations, models
+
+
+def refresh_is_adult(apps, schema_editor):
+    User = apps.get_model('troop89_auth', 'User')
+    PositionInstance = apps.get_model('trooporg', 'PositionInstance')
+
+    adult_positions = PositionInstance.objects.filter(incumbent=models.OuterRef('pk'), type__is_adult=True)
+    User.objects.update(is_adult=models.Exists(adult_positions))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('troop89_auth', '0001_initial'),
+        ('trooporg', '0017_term_position_instance_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='is_adult',
+            field=models.BooleanField(default=False, editable=False, help_text='Whether or not this user has held an adult position in the troop.'),
+        ),
+        migrations.RunPython(refresh_is_adult, migrations.RunPython.noop),
+    ]
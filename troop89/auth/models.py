@@ -5,17 +5,24 @@
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 from django.contrib.auth.models import AbstractUser
+from django.db import models
 
 
 class User(AbstractUser):
     """
     Custom user model to enable future expansion.
 
-    For now, now additional model-level functionality has been added. Users
-    stand as is.
+    Users additionally record whether they are an adult, which is derived
+    from the positions that they have held in the troop. The flag is stored
+    on the user so that member names can be displayed without querying their
+    positions. It is maintained by ``troop89.trooporg.signals``.
 
     Defined as recommended by the `django authentication docs`_.
 
     .. _django authentication docs: https://docs.djangoproject.com/en/2.0/topics/auth/customizing/#using-a-custom-user-model-when-starting-a-project
     """
-    pass
+    is_adult = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text='Whether or not this user has held an adult position in the troop.',
+    )
@@ -0,0 +1,285 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Synthetic dataset generation.
+
+Generates realistic volumes of rows for every model that affects the
+performance of the site's public pages. Rows are inserted with
+``bulk_create`` and the generated values only depend on the given seed and
+the current date, so repeated runs produce comparable data.
+"""
+
+import datetime
+import random
+from typing import Dict, List, NamedTuple, Sequence, Type
+
+from django.conf import settings
+from django.contrib.flatpages.models import FlatPage
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from troop89.announcements.models import Announcement
+from troop89.events.models import Event, EventDay, EventType
+from troop89.trooporg.models import Member, Patrol, PatrolMembership, PositionInstance, PositionType, Term
+
+# Approximate length of a term.
+TERM_LENGTH = datetime.timedelta(days=182)
+
+WORDS = (
+    'camp', 'hike', 'canoe', 'troop', 'patrol', 'merit', 'badge', 'court', 'honor',
+    'eagle', 'project', 'service', 'meeting', 'campfire', 'knot', 'compass', 'trail',
+    'summit', 'river', 'cabin', 'winter', 'summer', 'backpacking', 'first', 'aid',
+)
+
+FIRST_NAMES = (
+    'Alex', 'Ben', 'Charlie', 'Dan', 'Eli', 'Finn', 'Gabe', 'Henry', 'Isaac', 'Jack',
+    'Kyle', 'Liam', 'Max', 'Nate', 'Owen', 'Pat', 'Quinn', 'Ryan', 'Sam', 'Tom',
+)
+
+LAST_NAMES = (
+    'Adams', 'Baker', 'Clark', 'Davis', 'Evans', 'Foster', 'Garcia', 'Harris', 'Irwin',
+    'Jones', 'King', 'Lewis', 'Moore', 'Nelson', 'Ortiz', 'Parker', 'Reed', 'Smith',
+)
+
+
+class DatasetSize(NamedTuple):
+    """Number of rows of each kind to generate."""
+    event_types: int = 8
+    events: int = 5000
+    announcements: int = 500
+    members: int = 400
+    terms: int = 200
+    positions_per_term: int = 20
+    patrols: int = 100
+    memberships_per_term: int = 60
+    flatpage_depth: int = 4
+    flatpage_breadth: int = 5
+
+    def scaled(self, factor: float) -> 'DatasetSize':
+        """Return a copy of this size with every volume multiplied by the given factor."""
+        return self._make(max(1, round(value * factor)) for value in self)
+
+
+def generate_dataset(size: DatasetSize = DatasetSize(), seed: int = 0, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Generate a synthetic dataset of the given size.
+
+    Return the number of rows that were created for each model.
+    """
+    rng = random.Random(seed)
+    with transaction.atomic():
+        event_types = _bulk_create(EventType, [
+            EventType(label=f'Type {i}') for i in range(size.event_types)
+        ], batch_size)
+        events = _bulk_create(Event, _generate_events(rng, size, event_types), batch_size)
+        event_days = EventDay.objects.bulk_create((
+            EventDay(event=event, date=day) for event in events for day in event.local_date_range()
+        ), batch_size=batch_size)
+        members = _bulk_create(Member, _generate_members(rng, size, seed), batch_size)
+        announcements = _bulk_create(Announcement, _generate_announcements(rng, size, members), batch_size)
+        terms = _bulk_create(Term, _generate_terms(size), batch_size)
+        position_types = _bulk_create(PositionType, _generate_position_types(size, seed), batch_size)
+        positions = _bulk_create(
+            PositionInstance,
+            _generate_positions(rng, size, terms, members, position_types),
+            batch_size,
+        )
+        Member.objects.filter(position_instances__type__in=position_types).refresh_is_adult()
+        patrols = _bulk_create(Patrol, [
+            Patrol(name=f'Patrol {seed}-{i}', slug=f'patrol-{seed}-{i}') for i in range(size.patrols)
+        ], batch_size)
+        memberships = _bulk_create(
+            PatrolMembership,
+            _generate_memberships(rng, size, terms, members, patrols),
+            batch_size,
+        )
+        flatpages = _generate_flatpages(rng, size, batch_size)
+
+    # Bulk inserts do not send the signals that normally invalidate the
+    # cached pages and lookup structures, or that update the adult status of
+    # members (which is refreshed above).
+    cache.clear()
+
+    return {
+        'event_types': len(event_types),
+        'events': len(events),
+        'event_days': len(event_days),
+        'announcements': len(announcements),
+        'members': len(members),
+        'terms': len(terms),
+        'position_types': len(position_types),
+        'position_instances': len(positions),
+        'patrols': len(patrols),
+        'patrol_memberships': len(memberships),
+        'flatpages': flatpages,
+    }
+
+
+def _bulk_create(model: Type[models.Model], objs: Sequence[models.Model], batch_size: int) -> List[models.Model]:
+    """
+    Insert the given instances in batches and return them with their primary
+    keys set.
+    """
+    objs = model.objects.bulk_create(objs, batch_size=batch_size)
+    if objs and objs[0].pk is None:
+        # Some databases do not return the keys of bulk inserted rows, in
+        # which case the new rows are assumed to be the latest rows.
+        objs = list(model.objects.order_by('-pk')[:len(objs)])
+        objs.reverse()
+    return objs
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+
+def _markdown(rng: random.Random, paragraphs: int) -> str:
+    return '\n\n'.join(
+        f'{_sentence(rng, 12)}. **{_sentence(rng, 3)}** - {_sentence(rng, 20)}.'
+        for _ in range(paragraphs)
+    )
+
+
+def _generate_events(rng: random.Random, size: DatasetSize, types: Sequence[EventType]) -> List[Event]:
+    # Spread the events over the years surrounding today, about one
+    # event every other day.
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    earliest = now - datetime.timedelta(days=size.events)
+    events = []
+    for i in range(size.events):
+        start = earliest + datetime.timedelta(days=rng.randrange(size.events * 2), hours=rng.randrange(24))
+        # Most events last a few hours, while some last a week
+        if rng.random() < 0.9:
+            end = start + datetime.timedelta(hours=rng.randrange(1, 5))
+        else:
+            end = start + datetime.timedelta(days=rng.randrange(1, 8))
+        title = _sentence(rng, 3)[:36]
+        event = Event(
+            title=title,
+            slug=slugify(f'{title} {i}'),
+            description=_markdown(rng, rng.randrange(1, 4)),
+            type=rng.choice(types),
+            start=start,
+            end=end,
+            updated_at=now,
+        )
+        event.render_markdown()
+        events.append(event)
+    return events
+
+
+def _generate_members(rng: random.Random, size: DatasetSize, seed: int) -> List[Member]:
+    return [
+        Member(
+            username=f'member-{seed}-{i}',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            # Unusable password
+            password='!',
+        )
+        for i in range(size.members)
+    ]
+
+
+def _generate_announcements(rng: random.Random, size: DatasetSize, authors: Sequence[Member]) -> List[Announcement]:
+    # About one announcement per week, with a few scheduled for the future
+    now = timezone.now().replace(second=0, microsecond=0)
+    announcements = []
+    for i in range(size.announcements):
+        pub_date = now - datetime.timedelta(weeks=i - 2, hours=rng.randrange(24 * 7))
+        title = _sentence(rng, 6)[:120]
+        announcement = Announcement(
+            title=title,
+            slug=slugify(f'{title} {i}')[:50],
+            pub_date=pub_date,
+            content=_markdown(rng, rng.randrange(2, 8)),
+            author=rng.choice(authors),
+            updated_at=now,
+        )
+        announcement.render_markdown()
+        announcements.append(announcement)
+    return announcements
+
+
+def _generate_terms(size: DatasetSize) -> List[Term]:
+    # Consecutive terms ending with the term that contains today. Terms that
+    # would overlap with an existing term are skipped.
+    existing = list(Term.objects.values_list('start', 'end'))
+    today = datetime.date.today()
+    terms = []
+    end = today + TERM_LENGTH
+    for i in range(size.terms):
+        start = end - TERM_LENGTH
+        if not any(start < other_end and other_start < end for other_start, other_end in existing):
+            terms.append(Term(start=start, end=end))
+        end = start
+    return terms
+
+
+def _generate_position_types(size: DatasetSize, seed: int) -> List[PositionType]:
+    return [
+        PositionType(
+            title=f'Position {seed}-{i}',
+            precedence=size.positions_per_term - i,
+            is_adult=i % 4 == 0,
+            is_leader=i % 3 == 0,
+        )
+        for i in range(size.positions_per_term)
+    ]
+
+
+def _generate_positions(rng: random.Random, size: DatasetSize, terms: Sequence[Term],
+                        members: Sequence[Member], types: Sequence[PositionType]) -> List[PositionInstance]:
+    positions = []
+    for term in terms:
+        incumbents = rng.sample(members, min(len(types), len(members)))
+        positions.extend(
+            PositionInstance(incumbent=incumbent, term=term, type=position_type)
+            for incumbent, position_type in zip(incumbents, types)
+        )
+    return positions
+
+
+def _generate_memberships(rng: random.Random, size: DatasetSize, terms: Sequence[Term],
+                          members: Sequence[Member], patrols: Sequence[Patrol]) -> List[PatrolMembership]:
+    memberships = []
+    for term in terms:
+        scouts = rng.sample(members, min(size.memberships_per_term, len(members)))
+        # Each term, the scouts are split into groups of up to eight among
+        # a handful of the patrols
+        for i, scout in enumerate(scouts):
+            memberships.append(PatrolMembership(
+                scout=scout,
+                patrol=patrols[(term.pk + i // 8) % len(patrols)],
+                term=term,
+                type=PatrolMembership.MEMBER if i % 8 > 1 else i % 8,
+            ))
+    return memberships
+
+
+def _generate_flatpages(rng: random.Random, size: DatasetSize, batch_size: int) -> int:
+    # A tree of pages below each of the top-level flatpage urls
+    urls = []
+    parents = ['/about/', '/records/']
+    for _ in range(size.flatpage_depth):
+        urls.extend(parents)
+        parents = [f'{parent}page-{i}/' for parent in parents for i in range(size.flatpage_breadth)]
+
+    # Skip pages that already exist
+    existing = set(FlatPage.objects.filter(url__in=urls).values_list('url', flat=True))
+    pages = _bulk_create(FlatPage, [
+        FlatPage(url=url, title=_sentence(rng, 4)[:200], content=f'<p>{_sentence(rng, 80)}</p>')
+        for url in urls if url not in existing
+    ], batch_size)
+
+    FlatPage.sites.through.objects.bulk_create([
+        FlatPage.sites.through(flatpage_id=page.pk, site_id=settings.SITE_ID)
+        for page in pages
+    ], batch_size=batch_size)
+    return len(pages)
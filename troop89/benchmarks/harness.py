@@ -0,0 +1,251 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Benchmark harness for the site's public routes.
+
+Each route is requested once with empty caches ("cold") and then several
+more times with warm caches. The number of queries, the wall time and the
+peak memory allocated by each request are recorded, and may be compared
+against a set of budgets to catch performance regressions.
+
+Some expensive functions that are hidden behind caches in the routes are
+also timed on their own.
+"""
+
+import collections
+import datetime
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from django.contrib.flatpages.models import FlatPage
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from troop89.announcements.models import Announcement
+from troop89.events import utils as event_utils
+from troop89.events.models import Event, EventDay
+from troop89.trooporg.models import Patrol, Term
+
+DEFAULT_BUDGETS_PATH = Path(__file__).parent / 'budgets.json'
+
+
+class Route(NamedTuple):
+    """A route to benchmark, along with a function that builds a url for it."""
+    name: str
+    get_url: Callable[[], str]
+
+
+def _middle(queryset):
+    """Return the instance in the middle of the given queryset."""
+    return queryset[queryset.count() // 2]
+
+
+def _event_url(name: str) -> Callable[[], str]:
+    def get_url():
+        day = _middle(Event.objects.order_by('start')).start.date()
+        return reverse(name, args=(day.year, day.month, day.day))
+
+    return get_url
+
+
+def _month_url(name: str) -> Callable[[], str]:
+    def get_url():
+        today = datetime.date.today()
+        return reverse(name, args=(today.year, today.month))
+
+    return get_url
+
+
+def _announcement_month_url():
+    day = _middle(Announcement.objects.published()).pub_date.date()
+    return reverse('announcements:announcement-archive-month', args=(day.year, day.month))
+
+
+def _term_url():
+    day = _middle(Term.objects.all()).start
+    return reverse('trooporg:term-detail', args=(day.year, day.month, day.day))
+
+
+def _deepest_flatpage_url():
+    urls = FlatPage.objects.values_list('url', flat=True)
+    return max(urls, key=lambda url: (url.count('/'), url))
+
+
+ROUTES = [
+    Route('home', lambda: reverse('home')),
+    Route('events:calendar-month', _month_url('events:calendar-month')),
+    Route('events:event-archive-month', _month_url('events:event-archive-month')),
+    Route('events:event-archive-day', _event_url('events:event-archive-day')),
+    Route('events:event-detail', lambda: _middle(Event.objects.order_by('start')).get_absolute_url()),
+    Route('trooporg:current-term', lambda: reverse('trooporg:current-term')),
+    Route('trooporg:term-detail', _term_url),
+    Route('trooporg:term-list', lambda: reverse('trooporg:term-list')),
+    Route('trooporg:patrol-detail', lambda: _middle(Patrol.objects.order_by('pk')).get_absolute_url()),
+    Route('announcements:announcement-index', lambda: reverse('announcements:announcement-index')),
+    Route('announcements:announcement-archive-year', lambda: reverse(
+        'announcements:announcement-archive-year', args=(datetime.date.today().year,)
+    )),
+    Route('announcements:announcement-archive-month', _announcement_month_url),
+    Route('announcements:announcement-detail', lambda: _middle(Announcement.objects.published()).get_absolute_url()),
+    Route('about', lambda: reverse('about')),
+    Route('records', lambda: reverse('records')),
+    Route('flatpage', _deepest_flatpage_url),
+    Route('sitemap-index', lambda: reverse('sitemap-index')),
+    Route('sitemap-section', lambda: reverse('sitemap-section', args=('events',))),
+]
+
+
+def _calendar_renderer() -> Callable[[], str]:
+    # Render the busiest month, excluding the time spent querying its events
+    months = collections.Counter((day.year, day.month) for day in EventDay.objects.values_list('date', flat=True))
+    (year, month), _ = months.most_common(1)[0]
+    events_by_date = event_utils.fetch_calendar_events(year, month)
+
+    return lambda: render_to_string('events/includes/calendar.html', {
+        'calendar': event_utils.EventCalendar(year, month, events_by_date=events_by_date),
+        'month': datetime.date(year, month, 1),
+        'next_month': datetime.date(year, month, 1),
+        'previous_month': datetime.date(year, month, 1),
+    })
+
+
+class Function(NamedTuple):
+    """A function to benchmark, along with a function that sets it up."""
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+
+
+FUNCTIONS = [
+    Function('events:render-calendar', _calendar_renderer),
+]
+
+
+class FunctionResult(NamedTuple):
+    """The measurements for a single function."""
+    name: str
+    time_ms: float
+
+
+def benchmark_function(function: Function, repeat: int = 5) -> FunctionResult:
+    """Benchmark the given function."""
+    func = function.setup()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return FunctionResult(function.name, round(statistics.median(times), 2))
+
+
+class RouteResult(NamedTuple):
+    """The measurements for a single route."""
+    name: str
+    url: str
+    status_code: int
+    cold_queries: int
+    warm_queries: int
+    cold_time_ms: float
+    warm_time_ms: float
+    peak_memory_kib: float
+
+
+def _measure(client: Client, url: str):
+    """Request the given url, returning the response, the query count and the wall time."""
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - start
+    return response, len(queries), elapsed * 1000
+
+
+def benchmark_route(client: Client, route: Route, repeat: int = 5) -> RouteResult:
+    """Benchmark the given route."""
+    url = route.get_url()
+
+    cache.clear()
+    response, cold_queries, cold_time = _measure(client, url)
+
+    warm_queries, warm_times = 0, []
+    for _ in range(repeat):
+        _, warm_queries, elapsed = _measure(client, url)
+        warm_times.append(elapsed)
+
+    # Memory is traced in a separate request since tracing slows down
+    # everything that it traces.
+    cache.clear()
+    tracemalloc.start()
+    try:
+        client.get(url)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return RouteResult(
+        name=route.name,
+        url=url,
+        status_code=response.status_code,
+        cold_queries=cold_queries,
+        warm_queries=warm_queries,
+        cold_time_ms=round(cold_time, 2),
+        warm_time_ms=round(statistics.median(warm_times), 2),
+        peak_memory_kib=round(peak_memory / 1024, 1),
+    )
+
+
+def run_benchmarks(routes: List[Route] = ROUTES, repeat: int = 5) -> List[RouteResult]:
+    """Benchmark each of the given routes against the current database."""
+    client = Client()
+    return [benchmark_route(client, route, repeat) for route in routes]
+
+
+def run_function_benchmarks(functions: List[Function] = FUNCTIONS, repeat: int = 5) -> List[FunctionResult]:
+    """Benchmark each of the given functions against the current database."""
+    return [benchmark_function(function, repeat) for function in functions]
+
+
+def load_budgets(path: Path = DEFAULT_BUDGETS_PATH) -> Dict[str, Dict[str, float]]:
+    """
+    Load the budgets from the given JSON file.
+
+    The file should map route names to the maximum value of any of the
+    measurements of that route, e.g. ``{"home": {"cold_queries": 3}}``.
+    """
+    with open(path) as file:
+        return json.load(file)
+
+
+def check_budgets(results: List[NamedTuple], budgets: Dict[str, Dict[str, float]]) -> List[str]:
+    """Return a description of every measurement that exceeds its budget."""
+    regressions = []
+    for result in results:
+        if getattr(result, 'status_code', 200) != 200:
+            regressions.append(f'{result.name}: {result.url} responded with {result.status_code}')
+        for measurement, budget in budgets.get(result.name, {}).items():
+            value = getattr(result, measurement)
+            if value > budget:
+                regressions.append(f'{result.name}: {measurement} of {value} exceeds budget of {budget}')
+    return regressions
+
+
+def make_report(results: List[RouteResult], function_results: List[FunctionResult],
+                dataset: Dict[str, int], regressions: List[str]) -> dict:
+    """Return a JSON serializable report of the given results."""
+    return {
+        'created': datetime.datetime.now().isoformat(),
+        'dataset': dataset,
+        'routes': [result._asdict() for result in results],
+        'functions': [result._asdict() for result in function_results],
+        'regressions': regressions,
+    }
@@ -0,0 +1,77 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from troop89.benchmarks import harness
+from troop89.benchmarks.dataset import DatasetSize, generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the site's public routes against a synthetic dataset in a "
+        "test database, failing if any measurement exceeds its budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', type=float, default=1.0,
+            help="Factor by which to scale the default size of the dataset.",
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help="Seed used to generate the dataset.",
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help="Number of times to request each route with warm caches.",
+        )
+        parser.add_argument(
+            '--budgets', type=Path, default=harness.DEFAULT_BUDGETS_PATH,
+            help="JSON file containing the budget of each route.",
+        )
+        parser.add_argument(
+            '--output', type=Path,
+            help="File to write the JSON report to.",
+        )
+
+    def handle(self, *args, scale, seed, repeat, budgets, output, **options):
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+        try:
+            # Requests are made with the test client, which does not use https
+            with override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False):
+                dataset = generate_dataset(DatasetSize().scaled(scale), seed)
+                results = harness.run_benchmarks(repeat=repeat)
+                function_results = harness.run_function_benchmarks(repeat=repeat)
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+        regressions = harness.check_budgets(results + function_results, harness.load_budgets(budgets))
+        report = harness.make_report(results, function_results, dataset, regressions)
+
+        for result in results:
+            self.stdout.write(
+                f'{result.name:<45} {result.cold_queries:>4} / {result.warm_queries:<4} queries '
+                f'{result.cold_time_ms:>9.2f} / {result.warm_time_ms:<9.2f} ms '
+                f'{result.peak_memory_kib:>10.1f} KiB'
+            )
+        for result in function_results:
+            self.stdout.write(f'{result.name:<45} {result.time_ms:>30.2f} ms')
+
+        if output:
+            with open(output, 'w') as file:
+                json.dump(report, file, indent=2)
+
+        if regressions:
+            raise CommandError('Budget regressions:\n' + '\n'.join(regressions))
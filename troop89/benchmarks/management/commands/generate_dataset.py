@@ -0,0 +1,58 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from troop89.benchmarks.dataset import DatasetSize, generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Add a synthetic dataset of events, announcements, members, terms, "
+        "positions, patrols and flatpages to the database, for use in load "
+        "testing and profiling."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', type=float, default=1.0,
+            help="Factor by which to scale the default volumes.",
+        )
+        for field, default in DatasetSize._field_defaults.items():
+            parser.add_argument(
+                '--{}'.format(field.replace('_', '-')), type=int, dest=field,
+                help=f"Override the {field.replace('_', ' ')} of the dataset (default: {default} times the scale).",
+            )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help="Seed for the random number generator. The same seed always generates the same data, "
+                 "so each seed may only be used once per database.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of rows to insert per query.",
+        )
+        parser.add_argument(
+            '--noinput', '--no-input', action='store_false', dest='interactive',
+            help="Do NOT prompt the user for confirmation.",
+        )
+
+    def handle(self, *args, scale, seed, batch_size, interactive, **options):
+        size = DatasetSize().scaled(scale)._replace(**{
+            field: options[field] for field in DatasetSize._fields if options[field] is not None
+        })
+
+        if interactive:
+            answer = input(
+                "This will add a large amount of synthetic data to the database. "
+                "Are you sure you want to do this?\n\nType 'yes' to continue, or 'no' to cancel: "
+            )
+            if answer != 'yes':
+                raise CommandError("Dataset generation cancelled.")
+
+        counts = generate_dataset(size, seed, batch_size)
+        for model, count in counts.items():
+            self.stdout.write(f"Created {count} {model.replace('_', ' ')}.")
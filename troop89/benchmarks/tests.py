@@ -0,0 +1,59 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import io
+import random
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from troop89.events.models import Event, EventType
+from troop89.trooporg.models import PatrolMembership
+from . import dataset, harness
+from .dataset import DatasetSize, generate_dataset
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class BenchmarkHarnessTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(DatasetSize().scaled(0.01), seed=89)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_dataset_is_deterministic(self):
+        size = DatasetSize().scaled(0.01)
+        types = list(EventType.objects.all())
+        first, second = (dataset._generate_events(random.Random(89), size, types) for _ in range(2))
+        self.assertListEqual([e.slug for e in first], [e.slug for e in second])
+
+    def test_every_route_responds(self):
+        results = harness.run_benchmarks(repeat=1)
+        self.assertListEqual([r.name for r in results], [r.name for r in harness.ROUTES])
+        self.assertListEqual(harness.check_budgets(results, {}), [])
+
+    def test_every_function_runs(self):
+        results = harness.run_function_benchmarks(repeat=1)
+        self.assertListEqual([r.name for r in results], [f.name for f in harness.FUNCTIONS])
+
+    def test_budget_regressions_reported(self):
+        result = harness.benchmark_route(self.client, harness.ROUTES[0], repeat=1)
+        regressions = harness.check_budgets([result], {result.name: {'warm_queries': -1}})
+        self.assertEqual(len(regressions), 1)
+
+
+class GenerateDatasetCommandTest(TestCase):
+
+    def test_generate_configured_volumes(self):
+        call_command(
+            'generate_dataset', '--scale=0', '--events=30', '--memberships-per-term=4',
+            '--noinput', stdout=io.StringIO(),
+        )
+        self.assertEqual(Event.objects.count(), 30)
+        self.assertTrue(PatrolMembership.objects.exists())
@@ -0,0 +1,287 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Caching utilities shared by the site's apps.
+
+Values cached by ``get_or_compute`` (or the ``cached`` decorator) are
+protected against cache stampedes, in which many workers recompute the same
+expensive value at once after it expires:
+
+* Only one worker at a time recomputes a value. The worker is chosen with a
+  lock built on ``cache.add``.
+* While a value is being recomputed, the other workers are served the
+  previous, stale, value. If there is no previous value, they wait briefly
+  for the new value instead.
+* Values may be recomputed before they expire, with a probability that
+  increases as they approach their expiry and with the time that they took
+  to compute, so that expensive values are usually refreshed before anyone
+  has to wait for them.
+
+To invalidate a value while still allowing it to be served stale, use
+``expire`` rather than deleting it from the cache. Each key has a generation
+counter, which ``expire`` increments atomically. Cached values remember the
+generation that they were computed in and are stale once it changes, so an
+expiry is never lost to a worker that was recomputing the value at the time.
+"""
+
+import functools
+import hashlib
+import math
+import random
+import time
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+from django.db import transaction
+
+# Maximum number of seconds that one worker may spend recomputing a value
+# before another worker is allowed to try.
+LOCK_TIMEOUT = 30
+
+# Maximum number of seconds to wait for another worker to compute a value
+# that has no stale copy.
+LOCK_WAIT_TIMEOUT = 5
+
+LOCK_POLL_INTERVAL = 0.05
+
+# Number of seconds that an expired value is kept so that it may be served
+# while it is being recomputed.
+DEFAULT_STALE_TIMEOUT = 60 * 60
+
+# Weight of the computation time in the probability of early expiration.
+# Larger values result in earlier recomputations.
+DEFAULT_BETA = 1.0
+
+
+class CacheEntry(NamedTuple):
+    """A cached value along with the information needed to validate it."""
+    value: Any
+    # Time after which the value is stale, or None if it never expires
+    expires_at: Optional[float]
+    # Number of seconds taken to compute the value
+    delta: float
+    version: Any = None
+    # Generation of the key when the value was computed
+    generation: Optional[int] = None
+
+    def is_fresh(self, generation: Optional[int], version: Any = None, beta: float = DEFAULT_BETA) -> bool:
+        """
+        Return True if this entry is still fresh.
+
+        Entries that are about to expire are randomly considered to be stale,
+        as described by Vattani et al. in "Optimal Probabilistic Cache
+        Stampede Prevention".
+        """
+        if self.generation != generation or self.version != version:
+            return False
+        if self.expires_at is None:
+            return True
+        # 1 - random() lies in (0, 1], so the logarithm is never undefined
+        early = -self.delta * beta * math.log(1.0 - random.random())
+        return time.time() + early < self.expires_at
+
+
+def get_or_compute(key: str, compute: Callable[[], Any], timeout: Optional[int],
+                   stale_timeout: int = DEFAULT_STALE_TIMEOUT, beta: float = DEFAULT_BETA,
+                   version: Any = None, cacheable: Callable[[Any], bool] = None) -> Any:
+    """
+    Return the value cached under the given key, computing it if it is
+    missing or stale.
+
+    Values are fresh for ``timeout`` seconds, or forever if ``timeout`` is
+    None, and as long as they were computed with the same ``version``. Stale
+    values are kept for a further ``stale_timeout`` seconds.
+
+    If given, ``cacheable`` is called with each computed value and should
+    return False for values that should not be cached.
+    """
+    generation_key = _generation_key(key)
+    values = cache.get_many([key, generation_key])
+    entry = values.get(key)
+    if not isinstance(entry, CacheEntry):
+        # Discard values that were cached by other means
+        entry = None
+    generation = values.get(generation_key)
+    if generation is None:
+        # The generation was never set or was evicted, so any cached value
+        # cannot be validated.
+        generation = _start_generation(generation_key)
+
+    if entry is not None and entry.is_fresh(generation, version, beta):
+        return entry.value
+
+    lock_key = f'{key}.lock'
+    if not cache.add(lock_key, True, LOCK_TIMEOUT):
+        # Another worker is already computing the value
+        if entry is not None:
+            return entry.value
+        entry = _wait_for_entry(key)
+        if entry is not None:
+            return entry.value
+        # Give up on waiting and compute the value without the lock
+        return _compute_entry(key, compute, timeout, stale_timeout, version, generation, cacheable).value
+
+    try:
+        return _compute_entry(key, compute, timeout, stale_timeout, version, generation, cacheable).value
+    finally:
+        cache.delete(lock_key)
+
+
+def expire(*keys: str):
+    """
+    Mark the values cached under the given keys as stale, so that they are
+    recomputed the next time that they are requested.
+
+    Values that are being computed while they are expired are stale as soon
+    as they are cached.
+    """
+    for key in keys:
+        generation_key = _generation_key(key)
+        try:
+            cache.incr(generation_key)
+        except ValueError:
+            # There is no generation to increment, so start a new one. This
+            # cannot be mistaken for an earlier generation of the key.
+            _start_generation(generation_key)
+
+
+def expire_on_commit(*keys: str):
+    """
+    Expire the values cached under the given keys now and again once the
+    current transaction commits.
+
+    Another worker may recompute a value from the database before the
+    transaction commits, and so cache the data from before the change. The
+    second expiry discards that value. Outside of a transaction, the values
+    are expired only once.
+    """
+    expire(*keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: expire(*keys))
+
+
+def cached(key: Callable[..., str], timeout: Optional[int], stale_timeout: int = DEFAULT_STALE_TIMEOUT,
+           beta: float = DEFAULT_BETA):
+    """
+    Cache the return values of the decorated function with ``get_or_compute``.
+
+    ``key`` is called with the arguments of each call to the function and
+    should return the cache key for its return value. The decorated function
+    has an ``expire`` method that accepts the same arguments and expires the
+    corresponding value.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(
+                key(*args, **kwargs),
+                lambda: func(*args, **kwargs),
+                timeout,
+                stale_timeout,
+                beta,
+            )
+
+        def expire_value(*args, **kwargs):
+            expire(key(*args, **kwargs))
+
+        wrapper.expire = expire_value
+        return wrapper
+
+    return decorator
+
+
+def cache_public_page(name: str, timeout: int, get_version: Callable[[], str],
+                      stale_timeout: int = DEFAULT_STALE_TIMEOUT, vary_on_params: Sequence[str] = ()):
+    """
+    Cache the responses of the decorated view for visitors who are not staff
+    members, and so who all see the same page.
+
+    Cached responses are keyed by the given name, the current site, the path
+    and the values of the query parameters named in ``vary_on_params``. They
+    are considered fresh for ``timeout`` seconds, as long as ``get_version``
+    returns the same value as when they were rendered. ``get_version`` is
+    called on every request, so it should not perform any queries.
+
+    Note that any other query parameters are ignored.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or request.user.is_staff:
+                return view(request, *args, **kwargs)
+
+            def render():
+                response = view(request, *args, **kwargs)
+                if callable(getattr(response, 'render', None)):
+                    response = response.render()
+                return response
+
+            return get_or_compute(
+                f'page.{name}.{get_current_site(request).pk}.{_request_digest(request, vary_on_params)}',
+                render,
+                timeout,
+                stale_timeout,
+                version=get_version(),
+                # Responses that set cookies are specific to a single visitor
+                cacheable=lambda response: response.status_code == 200 and not response.cookies,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def _request_digest(request, params: Sequence[str]) -> str:
+    # The path may contain characters that are not allowed in cache keys
+    parts = [request.path] + [f'{param}={request.GET.get(param, "")}' for param in params]
+    return hashlib.md5('&'.join(parts).encode()).hexdigest()
+
+
+def _generation_key(key: str) -> str:
+    return f'{key}.generation'
+
+
+def _start_generation(generation_key: str) -> int:
+    """
+    Set the generation stored under the given key to a new value unless it
+    is already set, returning the resulting generation.
+    """
+    # Microseconds since the epoch never repeat an earlier generation
+    cache.add(generation_key, int(time.time() * 10 ** 6), None)
+    return cache.get(generation_key)
+
+
+def _compute_entry(key: str, compute: Callable[[], Any], timeout: Optional[int], stale_timeout: int,
+                   version: Any, generation: Optional[int],
+                   cacheable: Optional[Callable[[Any], bool]]) -> CacheEntry:
+    start = time.time()
+    value = compute()
+    now = time.time()
+
+    entry = CacheEntry(
+        value=value,
+        expires_at=None if timeout is None else now + timeout,
+        delta=now - start,
+        version=version,
+        generation=generation,
+    )
+    if cacheable is None or cacheable(value):
+        cache.set(key, entry, None if timeout is None else timeout + stale_timeout)
+    return entry
+
+
+def _wait_for_entry(key: str) -> Optional[CacheEntry]:
+    deadline = time.time() + LOCK_WAIT_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if isinstance(entry, CacheEntry):
+            return entry
+    return None
@@ -20,11 +20,9 @@ date-spanning items. Currently, only the following cases are supported:
 """
 
 import datetime
-import functools
 
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
-from django.db.models import Q
 from django.shortcuts import Http404
 from django.utils import timezone
 from django.utils.functional import cached_property
@@ -80,22 +78,33 @@ class DateRangeMixin(DateMixin):
             raise ImproperlyConfigured("{0}.end_date_field and {0}.start_date_field MUST be of the same field type.")
         return start_datetime
 
-    def _make_single_date_lookup(self, date):
+    def _make_range_lookup(self, since, until):
         """
-        Get the lookup kwargs for filtering on a single date.
+        Get the lookup kwargs for filtering on the items that overlap with
+        the period between ``since`` and ``until``.
+
+        Note that an item overlaps with the period if it ends after the period
+        begins and begins before the period ends. This also matches the items
+        which span the entire period.
         """
         start_date_field = self.get_date_field_start()
         end_date_field = self.get_date_field_end()
 
+        return {
+            '{}__gte'.format(end_date_field): since,
+            '{}__lt'.format(start_date_field): until,
+        }
+
+    def _make_single_date_lookup(self, date):
+        """
+        Get the lookup kwargs for filtering on a single date.
+        """
         since = self._make_date_lookup_arg(date)
         until = self._make_date_lookup_arg(
             date if not self.uses_datetime_field else date + datetime.timedelta(days=1)
         )
 
-        return {
-            '{}__gte'.format(end_date_field): since,
-            '{}__lt'.format(start_date_field): until,
-        }
+        return self._make_range_lookup(since, until)
 
 
 class BaseDateRangeListView(MultipleObjectMixin, DateRangeMixin, View):
@@ -160,21 +169,14 @@ class BaseMonthDateRangeView(YearMixin, MonthMixin, BaseDateRangeListView):
         year = self.get_year()
         month = self.get_month()
 
-        date_field_start = self.get_date_field_start()
-        date_field_end = self.get_date_field_end()
-
         date = _date_from_string(year, self.get_year_format(), month, self.get_month_format())
 
         since = self._make_date_lookup_arg(date)
         until = self._make_date_lookup_arg(self._get_next_month(date))
 
-        # Query for items that either start or end during the given month
-        lookup_args = (Q(**{'{}__gte'.format(df): since}) & Q(**{'{}__lt'.format(df): until})
-                       for df in (date_field_start, date_field_end))
-
-        lookup_args = functools.reduce(Q.__or__, lookup_args)
-
-        qs = self.get_dated_queryset(lookup_args)
+        # Query for items that overlap with any part of the given month
+        lookup_kwargs = self._make_range_lookup(since, until)
+        qs = self.get_dated_queryset(**lookup_kwargs)
 
         return (qs, {
             'month': date,
@@ -11,3 +11,7 @@ class EventsConfig(AppConfig):
     name = 'troop89.events'
     label = 'events'
     verbose_name = 'Events'
+
+    def ready(self):
+        # Register signal receivers
+        from . import signals  # noqa: F401
@@ -0,0 +1,92 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Minimal iCalendar (RFC 5545) serialization of events.
+
+Calendars are serialized one line at a time so that they may be streamed to
+the client without building the whole calendar in memory.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+from typing import Callable, Iterable, Iterator
+
+from .models import Event
+
+PRODUCT_ID = '-//Troop 89 Medfield//Events//EN'
+
+# Content lines should not be longer than 75 octets, excluding the line break.
+MAX_LINE_OCTETS = 75
+
+DATETIME_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+def escape_text(text: str) -> str:
+    """Escape the given text for use as a TEXT property value."""
+    return text \
+        .replace('\\', '\\\\') \
+        .replace(';', '\\;') \
+        .replace(',', '\\,') \
+        .replace('\r\n', '\\n') \
+        .replace('\n', '\\n')
+
+
+def format_datetime(value: datetime) -> str:
+    """Format the given datetime as a UTC DATE-TIME property value."""
+    return value.astimezone(dt_timezone.utc).strftime(DATETIME_FORMAT)
+
+
+def fold_line(line: str) -> str:
+    """Fold the given content line into lines of at most 75 octets."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line + '\r\n'
+
+    parts = []
+    limit = MAX_LINE_OCTETS
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Do not split multi-octet characters
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        # Continuation lines begin with a space
+        limit = MAX_LINE_OCTETS - 1
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def serialize_event(event: Event, url: str, domain: str) -> Iterator[str]:
+    """Serialize the given event into the lines of a VEVENT component."""
+    yield 'BEGIN:VEVENT\r\n'
+    yield fold_line(f'UID:event-{event.pk}@{domain}')
+    yield fold_line(f'DTSTAMP:{format_datetime(event.updated_at)}')
+    yield fold_line(f'LAST-MODIFIED:{format_datetime(event.updated_at)}')
+    yield fold_line(f'DTSTART:{format_datetime(event.start)}')
+    yield fold_line(f'DTEND:{format_datetime(event.end)}')
+    yield fold_line(f'SUMMARY:{escape_text(event.title)}')
+    yield fold_line(f'CATEGORIES:{escape_text(event.type.label)}')
+    yield fold_line(f'DESCRIPTION:{escape_text(event.description)}')
+    yield fold_line(f'URL:{url}')
+    yield 'END:VEVENT\r\n'
+
+
+def serialize_calendar(events: Iterable[Event], name: str, build_url: Callable[[Event], str],
+                       domain: str) -> Iterator[str]:
+    """
+    Serialize the given events into a VCALENDAR object, yielding one chunk
+    per component.
+
+    ``build_url`` should return the absolute url of an event.
+    """
+    yield 'BEGIN:VCALENDAR\r\n'
+    yield 'VERSION:2.0\r\n'
+    yield fold_line(f'PRODID:{PRODUCT_ID}')
+    yield 'CALSCALE:GREGORIAN\r\n'
+    yield fold_line(f'X-WR-CALNAME:{escape_text(name)}')
+    for event in events:
+        yield ''.join(serialize_event(event, build_url(event), domain))
+    yield 'END:VCALENDAR\r\n'
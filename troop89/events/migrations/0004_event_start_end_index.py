@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-17 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_auto_20190607_1527'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start', 'end'], name='events_even_start_bfe45a_idx'),
+        ),
+    ]
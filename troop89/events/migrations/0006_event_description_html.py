@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-17 17:20
+
+from django.db import migrations, models
+from markdownx.utils import markdownify
+
+
+def render_descriptions(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    events = list(Event.objects.only('description'))
+    for event in events:
+        event.description_html = markdownify(event.description)
+    Event.objects.bulk_update(events, ['description_html'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_descriptions, migrations.RunPython.noop),
+    ]
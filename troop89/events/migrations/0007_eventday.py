@@ -0,0 +1,49 @@
+# Generated by Django 2.2.28 on 2026-10-17 19:05
+
+from datetime import timedelta
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def create_event_days(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventDay = apps.get_model('events', 'EventDay')
+
+    event_days = []
+    for event in Event.objects.only('start', 'end').iterator():
+        start_date = timezone.localtime(event.start).date()
+        end_date = timezone.localtime(event.end).date()
+        event_days.extend(
+            EventDay(event=event, date=start_date + timedelta(days=d))
+            for d in range((end_date - start_date).days + 1)
+        )
+    EventDay.objects.bulk_create(event_days, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_description_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDay',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='days', to='events.Event')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='eventday',
+            index=models.Index(fields=['date', 'event'], name='events_even_date_a1b34d_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='eventday',
+            unique_together={('event', 'date')},
+        ),
+        migrations.RunPython(create_event_days, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-17 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_eventday'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['end', 'start'], name='events_even_end_890293_idx'),
+        ),
+    ]
@@ -4,13 +4,14 @@
 #  License, v. 2.0. If a copy of the MPL was not distributed with this
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-from datetime import tzinfo
+from datetime import datetime, timedelta, tzinfo
 
 from django.db import models
 from django.shortcuts import reverse
 from django.utils import timezone
 from markdownx.models import MarkdownxField
-from markdownx.utils import markdownify
+
+from troop89.rendered_markdown.models import RenderedMarkdownModel
 
 
 class EventType(models.Model):
@@ -20,7 +21,7 @@ class EventType(models.Model):
         return self.label
 
 
-class Event(models.Model):
+class Event(RenderedMarkdownModel):
     title = models.CharField(max_length=36, blank=False)
 
     slug = models.SlugField(
@@ -31,39 +32,109 @@ class Event(models.Model):
 
     description = MarkdownxField()
 
+    description_html = models.TextField(blank=True, editable=False)
+
     type = models.ForeignKey(EventType, on_delete=models.CASCADE)
 
     start = models.DateTimeField(default=timezone.now)
 
     end = models.DateTimeField()
 
+    updated_at = models.DateTimeField(auto_now=True)
+
+    rendered_markdown_fields = {'description': 'description_html'}
+
     class Meta:
         ordering = ('start', 'title')
+        indexes = [
+            # Supports interval overlap lookups (see DateRangeMixin._make_range_lookup)
+            models.Index(fields=['start', 'end']),
+            # Supports lookups of upcoming events, which are bounded by their end
+            models.Index(fields=['end', 'start']),
+        ]
 
     # todo: revise formatting to be more user friendly
     def __str__(self):
         if self.single_day():
-            return '{} ({})'.format(self.title, self.start.ctime())
+            return '{} ({})'.format(self.title, self.local_start.ctime())
 
-        return '{} ({} - {})'.format(self.title, self.start.ctime(), self.end.ctime())
+        return '{} ({} - {})'.format(self.title, self.local_start.ctime(), self.local_end.ctime())
 
     def get_absolute_url(self):
         # Note: we localize the date for display here in order to simplify
         # detail view logic (Django localizes by default). A formal
         # decision regarding EST vs UTC times in urls will need to be
         # made in the future.
-        day = timezone.localdate(self.start)
+        day = self.local_start.date()
         return reverse('events:event-detail', args=(day.year, day.month, day.day, self.slug))
 
     @property
     def formatted_description(self):
-        """Render this event's markdown description into HTML."""
-        return markdownify(self.description)
+        """Return this event's markdown description rendered into HTML."""
+        return self.get_rendered_markdown('description')
+
+    @property
+    def local_start(self) -> datetime:
+        """Return this event's start time in the current time zone."""
+        return self._localtime('start')
+
+    @property
+    def local_end(self) -> datetime:
+        """Return this event's end time in the current time zone."""
+        return self._localtime('end')
 
     def single_day(self) -> bool:
-        return self.start.date() == self.end.date()
+        return self.local_start.date() == self.local_end.date()
 
     def local_date_range(self, timezone: tzinfo = None):
         from .utils import local_date_range
 
+        if timezone is None:
+            start_date = self.local_start.date()
+            delta = self.local_end.date() - start_date
+            return [start_date + timedelta(days=d) for d in range(delta.days + 1)]
         return local_date_range(self.start, self.end, timezone)
+
+    def _localtime(self, field: str) -> datetime:
+        """
+        Return the value of the given datetime field in the current time zone.
+
+        Conversions are memoized for each instance, since the same event
+        is usually displayed several times in the same page (e.g. on each day
+        of a calendar). They are recomputed if the field or the current time
+        zone changes.
+        """
+        value = getattr(self, field)
+        current_tz = timezone.get_current_timezone()
+        memo = self.__dict__.setdefault('_localtimes', {})
+        try:
+            memo_value, memo_tz, local = memo[field]
+            if memo_value == value and memo_tz is current_tz:
+                return local
+        except KeyError:
+            pass
+        local = timezone.localtime(value, current_tz)
+        memo[field] = (value, current_tz, local)
+        return local
+
+
+class EventDay(models.Model):
+    """
+    A local date that an event overlaps with.
+
+    Event days are denormalized from the start and end of each event so that
+    the events on a given date can be looked up with a single indexed query.
+    They are kept up to date by ``troop89.events.signals``.
+    """
+    event = models.ForeignKey(Event, related_name='days', on_delete=models.CASCADE)
+
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ('event', 'date')
+        indexes = [
+            models.Index(fields=['date', 'event']),
+        ]
+
+    def __str__(self):
+        return f'{self.event.title} ({self.date})'
@@ -0,0 +1,70 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Signal receivers that keep the events app's caches and denormalized event
+days consistent with the database.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import utils
+from .models import Event, EventType
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_months(sender, instance: Event, raw=False, **kwargs):
+    """
+    Record the months that an event overlapped with before it is saved so
+    that their calendars can be invalidated if the event is moved.
+    """
+    instance._previous_months = []
+    instance._previous_range = None
+    if instance.pk is None or raw:
+        return
+    try:
+        previous = Event.objects.only('start', 'end').get(pk=instance.pk)
+    except Event.DoesNotExist:
+        return
+    instance._previous_months = utils.months_spanned(previous.start, previous.end)
+    instance._previous_range = (previous.start, previous.end)
+
+
+@receiver(post_save, sender=Event)
+def update_event_days(sender, instance: Event, **kwargs):
+    """Update the dates that an event overlaps with if its start or end changed."""
+    # Event days only depend on the event itself, so they are also created
+    # for events loaded from fixtures.
+    if getattr(instance, '_previous_range', None) != (instance.start, instance.end):
+        utils.update_event_days(instance)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_calendars(sender, instance: Event, **kwargs):
+    """Discard the cached calendars of every month the event overlaps with."""
+    months = utils.months_spanned(instance.start, instance.end)
+    months += getattr(instance, '_previous_months', [])
+    utils.invalidate_calendar_months(months)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=EventType)
+@receiver(post_delete, sender=EventType)
+def touch_events_last_modified(sender, **kwargs):
+    """Record the time of the latest change to any event."""
+    utils.touch_events_last_modified()
+
+
+@receiver(post_save, sender=EventType)
+def invalidate_event_type_calendars(sender, instance: EventType, **kwargs):
+    """Discard the cached calendars of every month with an event of the given type."""
+    months = []
+    for start, end in Event.objects.filter(type=instance).values_list('start', 'end'):
+        months += utils.months_spanned(start, end)
+    utils.invalidate_calendar_months(months)
@@ -7,11 +7,20 @@
 from django.contrib.sitemaps import Sitemap
 
 from .models import Event
+from .utils import events_last_modified
 
 
 class EventSitemap(Sitemap):
     changefreq = "never"
     priority = 0.5
+    limit = 1000
 
     def items(self):
-        return Event.objects.all()
+        # Only fetch the fields needed to build each url
+        return Event.objects.only('slug', 'start', 'updated_at').order_by('pk')
+
+    def lastmod(self, item: Event):
+        return item.updated_at
+
+    def get_latest_lastmod(self):
+        return events_last_modified()
@@ -6,7 +6,6 @@
 
 from django import template
 from django.urls import reverse
-from django.utils import timezone
 
 from troop89.flatpages.models import HierarchicalFlatPage
 
@@ -43,5 +42,4 @@ def make_event_report_url(event):
     Render the URL for the 'Event Report' flatpage that corresponds with the
     given Event.
     """
-    start = timezone.localtime(event.start)
-    return f'{EVENT_REPORT_URL_STUB}/{start.year}/{event.slug}/'
+    return f'{EVENT_REPORT_URL_STUB}/{event.local_start.year}/{event.slug}/'
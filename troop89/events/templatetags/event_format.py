@@ -28,20 +28,23 @@ def is_today(day: Union[datetime, date]) -> bool:
 
 @register.simple_tag
 def event_date_overlap(event: Event, day: date, timezone: tzinfo = None) -> str:
-    starts_today = localtime(event.start, timezone).date() == day
-    ends_today = localtime(event.end, timezone).date() == day
+    if timezone is None:
+        # Reuse the event's memoized local times
+        start, end = event.local_start, event.local_end
+    else:
+        start, end = localtime(event.start, timezone), localtime(event.end, timezone)
 
-    start_local = localtime(event.start).strftime(TIME_FORMAT)
-    end_local = localtime(event.end).strftime(TIME_FORMAT)
+    starts_today = start.date() == day
+    ends_today = end.date() == day
 
     if starts_today:
         if ends_today:
-            return start_local + ' - ' + end_local
+            return start.strftime(TIME_FORMAT) + ' - ' + end.strftime(TIME_FORMAT)
         else:
-            return 'after ' + start_local
-    elif event.start.date() < day:  # event already began
+            return 'after ' + start.strftime(TIME_FORMAT)
+    elif start.date() < day:  # event already began
         if ends_today:
-            return 'until ' + end_local
+            return 'until ' + end.strftime(TIME_FORMAT)
         else:
             return 'all day'
     return ''
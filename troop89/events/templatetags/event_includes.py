@@ -7,12 +7,19 @@
 from datetime import timedelta
 
 from django import template
+from django.core.cache import cache
 from django.utils import timezone
 
+from .. import utils
 from ..models import Event
 
 register = template.Library()
 
+# Upcoming events are cached for each minute. Cached lists are also replaced
+# whenever an event changes, since the key includes the time of the latest
+# change.
+UPCOMING_EVENTS_CACHE_TIMEOUT = 60
+
 
 @register.inclusion_tag('events/includes/event_listing.html')
 def render_upcoming_events(limit: int = None, **kwargs) -> dict:
@@ -32,6 +39,9 @@ def render_upcoming_events(limit: int = None, **kwargs) -> dict:
     time 00:00 tomorrow) and whose end time has not yet occurred.
 
     If no events are found, the `empty` test is displayed.
+
+    The current time is rounded down to the minute so that the events may be
+    cached and shared between requests.
     """
     try:
         error_msg = kwargs.pop('empty')
@@ -39,10 +49,28 @@ def render_upcoming_events(limit: int = None, **kwargs) -> dict:
         error_msg = 'There are no events to display.'
     if not kwargs:
         raise ValueError('render_upcoming_events kwargs MUST not be empty')
-    today = timezone.now()
+    today = timezone.now().replace(second=0, microsecond=0)
     end_date = timezone.localtime(today + timedelta(**kwargs))
     end_date = end_date.replace(hour=0, minute=0)  # Compare only the date of the end bound
+
+    last_modified = utils.events_last_modified()
+    cache_key = 'events.upcoming.{}.{}.{}.{}'.format(
+        limit,
+        end_date.timestamp(),
+        today.timestamp(),
+        last_modified.timestamp() if last_modified else '',
+    )
+    events = cache.get(cache_key)
+    if events is None:
+        events = Event.objects \
+            .filter(start__lte=end_date, end__gte=today) \
+            .only('title', 'slug', 'start', 'end')
+        if limit is not None:
+            events = events[:limit]
+        events = list(events)
+        cache.set(cache_key, events, UPCOMING_EVENTS_CACHE_TIMEOUT)
+
     return {
-        'events': Event.objects.filter(start__lte=end_date, end__gte=today),
+        'events': events,
         'error_msg': error_msg,
     }
@@ -5,13 +5,21 @@
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import datetime
+import io
 import unittest
 
 import pytz
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.management import call_command
 from django.shortcuts import reverse
 from django.test import TestCase, override_settings
+from django.utils import timezone
 
-from .utils import local_date_range
+from . import ical
+from .models import Event, EventDay, EventType
+from .templatetags.event_includes import render_upcoming_events
+from .utils import local_date_range, months_spanned, render_datetime_range
 
 
 class DateRangeTest(unittest.TestCase):
@@ -51,10 +59,70 @@ class DateRangeTest(unittest.TestCase):
         self.assertEqual(local_date_range(d2, d1, self.TIMEZONE), [])
 
 
+class MonthsSpannedTest(unittest.TestCase):
+    TIMEZONE = pytz.utc
+
+    def test_single_month(self):
+        d1 = datetime.datetime(2018, 7, 1, tzinfo=self.TIMEZONE)
+        d2 = datetime.datetime(2018, 7, 31, tzinfo=self.TIMEZONE)
+
+        self.assertEqual(months_spanned(d1, d2, self.TIMEZONE), [(2018, 7)])
+
+    def test_across_years(self):
+        d1 = datetime.datetime(2018, 11, 30, tzinfo=self.TIMEZONE)
+        d2 = datetime.datetime(2019, 2, 1, tzinfo=self.TIMEZONE)
+
+        self.assertEqual(
+            months_spanned(d1, d2, self.TIMEZONE),
+            [(2018, 11), (2018, 12), (2019, 1), (2019, 2)],
+        )
+
+
+class EventLocalTimeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.event = Event(
+            start=datetime.datetime(2018, 7, 1, 2, tzinfo=pytz.utc),
+            end=datetime.datetime(2018, 7, 1, 5, tzinfo=pytz.utc),
+        )
+
+    def test_local_times_follow_current_timezone(self):
+        with timezone.override(pytz.utc):
+            self.assertEqual(self.event.local_date_range(), [datetime.date(2018, 7, 1)])
+        with timezone.override(pytz.timezone('America/New_York')):
+            self.assertEqual(self.event.local_start.hour, 22)
+            self.assertEqual(
+                self.event.local_date_range(),
+                [datetime.date(2018, 6, 30), datetime.date(2018, 7, 1)],
+            )
+
+    def test_local_times_follow_changes(self):
+        with timezone.override(pytz.utc):
+            self.assertEqual(self.event.local_end.day, 1)
+            self.event.end += datetime.timedelta(days=1)
+            self.assertEqual(self.event.local_end.day, 2)
+            self.assertFalse(self.event.single_day())
+
+    def test_str_uses_local_times(self):
+        self.event.title = 'Campout'
+        with timezone.override(pytz.timezone('America/New_York')):
+            self.assertEqual(str(self.event), 'Campout (Sat Jun 30 22:00:00 2018 - Sun Jul  1 01:00:00 2018)')
+
+    def test_render_datetime_range_uses_local_times(self):
+        with timezone.override(pytz.timezone('America/New_York')):
+            self.assertEqual(
+                render_datetime_range(self.event, '%m/%d', '%H:%M'),
+                '06/30 22:00 - 07/01 01:00',
+            )
+
+
 @override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
 class CalendarMonthViewTestCase(TestCase):
     fixtures = ("events.json",)
 
+    def setUp(self):
+        cache.clear()
+
     def test_fetch_single_event_in_month(self):
         response = self.client.get('/calendar/2018/06/')
         events = response.context['object_list']
@@ -67,6 +135,42 @@ class CalendarMonthViewTestCase(TestCase):
         for response in (response_july, response_august):
             self.assertTrue(any(e.title == 'Camp Squanto' for e in response.context['object_list']))
 
+    def test_fetch_event_spanning_entire_month(self):
+        Event.objects.create(
+            title='Long Trek',
+            slug='long-trek',
+            type_id=3,
+            start=datetime.datetime(2018, 8, 20, tzinfo=pytz.utc),
+            end=datetime.datetime(2018, 10, 10, tzinfo=pytz.utc),
+        )
+        response = self.client.get('/calendar/2018/09/')
+        titles = [e.title for e in response.context['object_list']]
+        self.assertListEqual(titles, ['Long Trek'])
+
+    def test_day_view_matches_events_within_and_around_day(self):
+        response = self.client.get(reverse('events:event-archive-day', args=(2018, 7, 30)))
+        titles = [e.title for e in response.context['object_list']]
+        self.assertListEqual(titles, ['Camp Squanto'])
+
+    def test_calendar_invalidated_on_event_save(self):
+        self.assertContains(self.client.get('/calendar/2018/08/'), 'Camp Squanto')
+
+        event = Event.objects.get(title='Camp Squanto')
+        event.title = 'Camp Renamed'
+        event.save()
+
+        self.assertContains(self.client.get('/calendar/2018/08/'), 'Camp Renamed')
+
+    def test_calendar_invalidated_for_previous_months_on_event_move(self):
+        self.assertContains(self.client.get('/calendar/2018/07/'), 'Camp Squanto')
+
+        event = Event.objects.get(title='Camp Squanto')
+        event.start += datetime.timedelta(days=7)
+        event.end += datetime.timedelta(days=7)
+        event.save()
+
+        self.assertNotContains(self.client.get('/calendar/2018/07/'), 'Camp Squanto')
+
 
 @override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
 class EventDayViewTestCase(TestCase):
@@ -101,3 +205,170 @@ class RedirectCurrentMonthTestCase(TestCase):
         today = datetime.date.today()
         expected_url = reverse("events:calendar-month", args=(today.year, today.month))
         self.assertRedirects(response, expected_url)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class EventSitemapTestCase(TestCase):
+    fixtures = ("events.json",)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sitemap_index_links_sections(self):
+        response = self.client.get('/sitemap.xml')
+        self.assertContains(response, '/sitemap-events.xml')
+
+    def test_unmodified_sitemap_is_not_regenerated(self):
+        response = self.client.get('/sitemap-events.xml')
+        self.assertContains(response, '/calendar/2018/7/29/camp-squanto/')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                '/sitemap-events.xml',
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_sitemap_updated_on_event_change(self):
+        self.client.get('/sitemap-events.xml')
+
+        event = Event.objects.get(slug='camp-squanto')
+        event.slug = 'camp-squanto-2018'
+        event.save()
+
+        self.assertContains(self.client.get('/sitemap-events.xml'), 'camp-squanto-2018')
+
+    def test_sitemap_cached_per_site(self):
+        self.assertContains(self.client.get('/sitemap-events.xml'), Site.objects.get(pk=1).domain)
+
+        Site.objects.create(pk=2, domain='other.example.com', name='Other')
+        with self.settings(SITE_ID=2):
+            self.assertContains(self.client.get('/sitemap-events.xml'), 'other.example.com')
+
+
+class RenderedDescriptionTestCase(TestCase):
+    fixtures = ("events.json",)
+
+    def test_description_rendered_on_save(self):
+        event = Event.objects.get(slug='camp-squanto')
+        event.description = '**Bring a tent**'
+        event.save()
+
+        event.refresh_from_db()
+        self.assertEqual(event.description_html, '<p><strong>Bring a tent</strong></p>')
+        self.assertEqual(event.formatted_description, event.description_html)
+
+    def test_rerender_markdown_command(self):
+        event = Event.objects.get(slug='camp-squanto')
+        event.save()
+        Event.objects.filter(pk=event.pk).update(description_html='stale')
+
+        call_command('rerender_markdown', stdout=io.StringIO())
+
+        rendered = Event.objects.get(pk=event.pk)
+        self.assertEqual(rendered.description_html, '<p>A one-week stay in paradise</p>')
+        self.assertEqual(rendered.updated_at, event.updated_at)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class EventDayTestCase(TestCase):
+    fixtures = ("events.json",)
+
+    def test_days_created_for_fixtures(self):
+        event = Event.objects.get(slug='camp-squanto')
+        dates = list(event.days.values_list('date', flat=True).order_by('date'))
+        self.assertListEqual(dates, event.local_date_range())
+
+    def test_days_updated_on_event_move(self):
+        event = Event.objects.get(slug='camp-squanto')
+        event.start += datetime.timedelta(days=7)
+        event.end += datetime.timedelta(days=7)
+        event.save()
+
+        dates = list(EventDay.objects.filter(event=event).values_list('date', flat=True).order_by('date'))
+        self.assertListEqual(dates, event.local_date_range())
+
+    def test_day_view_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/calendar/2018/07/30/')
+        self.assertContains(response, 'Camp Squanto')
+
+
+class ICalendarTest(unittest.TestCase):
+
+    def test_escape_text(self):
+        self.assertEqual(ical.escape_text('Tents, food; a\\b\nc'), 'Tents\\, food\\; a\\\\b\\nc')
+
+    def test_fold_long_line(self):
+        folded = ical.fold_line('DESCRIPTION:' + 'é' * 80)
+        lines = folded.split('\r\n')[:-1]
+        self.assertTrue(all(len(line.encode('utf-8')) <= ical.MAX_LINE_OCTETS for line in lines))
+        self.assertEqual(''.join(line[1:] if i else line for i, line in enumerate(lines)), 'DESCRIPTION:' + 'é' * 80)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class EventFeedViewTestCase(TestCase):
+    fixtures = ("events.json",)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_contains_events(self):
+        response = self.client.get(reverse('events:event-feed'))
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.count('BEGIN:VEVENT'), Event.objects.count())
+        self.assertIn('SUMMARY:Camp Squanto', content)
+
+    def test_feed_filtered_by_type(self):
+        event = Event.objects.get(slug='camp-squanto')
+        response = self.client.get(reverse('events:event-type-feed', args=(event.type_id,)))
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.count('BEGIN:VEVENT'), Event.objects.filter(type=event.type).count())
+
+    def test_unchanged_feed_not_modified(self):
+        response = self.client.get(reverse('events:event-feed'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('events:event-feed'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_feed_modified_on_event_change(self):
+        etag = self.client.get(reverse('events:event-feed'))['ETag']
+        Event.objects.get(slug='camp-squanto').save()
+
+        response = self.client.get(reverse('events:event-feed'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class UpcomingEventsTagTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        event_type = EventType.objects.create(label='Meeting')
+        start = timezone.now() + datetime.timedelta(hours=1)
+        for i in range(3):
+            Event.objects.create(
+                title=f'Meeting {i}',
+                slug=f'meeting-{i}',
+                description='',
+                type=event_type,
+                start=start + datetime.timedelta(minutes=i),
+                end=start + datetime.timedelta(hours=1),
+            )
+
+    def test_limit_applied(self):
+        events = render_upcoming_events(2, days=2)['events']
+        self.assertListEqual([e.title for e in events], ['Meeting 0', 'Meeting 1'])
+
+    def test_events_cached(self):
+        render_upcoming_events(2, days=2)
+        with self.assertNumQueries(0):
+            render_upcoming_events(2, days=2)
+
+    def test_cache_invalidated_on_event_change(self):
+        render_upcoming_events(2, days=2)
+        Event.objects.filter(slug='meeting-0').get().delete()
+
+        events = render_upcoming_events(2, days=2)['events']
+        self.assertListEqual([e.title for e in events], ['Meeting 1', 'Meeting 2'])
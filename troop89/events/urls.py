@@ -38,6 +38,16 @@ urlpatterns = [
         views.EventMonthView.as_view(month_format=MONTH_FORMAT),
         name='event-archive-month'
     ),
+    path(
+        'feed.ics',
+        views.EventFeedView.as_view(),
+        name='event-feed'
+    ),
+    path(
+        'feed/<int:type_pk>.ics',
+        views.EventFeedView.as_view(),
+        name='event-type-feed'
+    ),
     path(
         'report/<int:pk>/',
         views.RedirectAddEventReportFlatpage.as_view(),
@@ -7,15 +7,23 @@
 import calendar
 import collections
 from datetime import date, datetime, timedelta
-from typing import Dict, List, NamedTuple, Sequence
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
+from django.core.cache import cache
+from django.db.models import Max
 from django.utils import timezone
 
-from troop89.trooporg.models import Member, PositionType, Term
-from .models import Event
+from troop89.cache import expire
+from .models import Event, EventDay
 
 FIRST_DAY_OF_WEEK = 6
 
+# Rendered calendars are invalidated explicitly when their events change, so
+# they may be kept around for quite a while.
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+
+LAST_MODIFIED_CACHE_KEY = 'events.last-modified'
+
 
 def local_date_range(start: datetime, end: datetime, tz=None) -> List[date]:
     """
@@ -27,6 +35,98 @@ def local_date_range(start: datetime, end: datetime, tz=None) -> List[date]:
     return [start_date + timedelta(days=d) for d in range(delta.days + 1)]
 
 
+def months_spanned(start: datetime, end: datetime, tz=None) -> List[Tuple[int, int]]:
+    """
+    Return every (year, month) pair that overlaps with the local dates
+    between two aware datetimes.
+    """
+    start_date = timezone.localtime(start, tz).date()
+    end_date = timezone.localtime(end, tz).date()
+
+    first = start_date.year * 12 + start_date.month - 1
+    last = end_date.year * 12 + end_date.month - 1
+
+    return [(m // 12, m % 12 + 1) for m in range(first, last + 1)]
+
+
+def calendar_cache_key(year: int, month: int) -> str:
+    """Return the cache key for the rendered calendar of the given month."""
+    key = f'events.calendar.{year}-{month:02}'
+
+    # Calendars near the current month may highlight today's date, so they
+    # must be cached separately for each day.
+    today = timezone.localdate()
+    if abs((year - today.year) * 12 + month - today.month) <= 1:
+        key += f'.{today.isoformat()}'
+    return key
+
+
+def invalidate_calendar_months(months: Iterable[Tuple[int, int]]):
+    """
+    Expire the cached calendars of the given (year, month) pairs.
+
+    The expired calendars may still be served while they are re-rendered.
+    """
+    expire(*{calendar_cache_key(year, month) for year, month in months})
+
+
+def events_last_modified() -> Optional[datetime]:
+    """
+    Return the last time that any event was changed, or None if there are no
+    events.
+
+    The time is cached and refreshed by ``troop89.events.signals`` so that
+    conditional requests may be validated without querying the event table.
+    """
+    # The time is wrapped in a tuple so that a missing time can be cached
+    cached = cache.get(LAST_MODIFIED_CACHE_KEY)
+    if cached is None:
+        cached = (Event.objects.aggregate(Max('updated_at'))['updated_at__max'],)
+        cache.set(LAST_MODIFIED_CACHE_KEY, cached, None)
+    return cached[0]
+
+
+def touch_events_last_modified():
+    """Record that the events have changed as of now."""
+    cache.set(LAST_MODIFIED_CACHE_KEY, (timezone.now(),), None)
+
+
+def update_event_days(event: Event):
+    """Bring the EventDay rows of the given event up to date with its start and end."""
+    dates = set(event.local_date_range())
+    existing = set(EventDay.objects.filter(event=event).values_list('date', flat=True))
+
+    if existing - dates:
+        EventDay.objects.filter(event=event, date__in=existing - dates).delete()
+    EventDay.objects.bulk_create(EventDay(event=event, date=day) for day in dates - existing)
+
+
+def fetch_calendar_events(year: int, month: int) -> Dict[date, List[Event]]:
+    """
+    Return the events that overlap with the given month, grouped by each of
+    the local dates shown on the month's calendar.
+
+    The events are fetched from the EventDay table with a single query.
+    """
+    weeks = calendar.Calendar(FIRST_DAY_OF_WEEK).monthdatescalendar(year, month)
+    since = timezone.make_aware(datetime(year, month, 1))
+    until = timezone.make_aware(datetime(year + month // 12, month % 12 + 1, 1))
+
+    event_days = EventDay.objects \
+        .filter(date__range=(weeks[0][0], weeks[-1][-1]), event__end__gte=since, event__start__lt=until) \
+        .select_related('event') \
+        .order_by('date', 'event__start', 'event__title', 'event__pk')
+
+    # Share one instance between all of the days of each event
+    events = {}
+    date_map = collections.defaultdict(list)
+    for event_day in event_days:
+        event = events.setdefault(event_day.event_id, event_day.event)
+        date_map[event_day.date].append(event)
+
+    return date_map
+
+
 def _group_by_date(events: Sequence[Event]) -> Dict[date, List[Event]]:
     date_map = collections.defaultdict(list)
 
@@ -42,10 +142,12 @@ class EventCalendar:
         date: date
         events: List[Event]
 
-    def __init__(self, year: int, month: int, events: Sequence[Event] = None, title: str = None):
+    def __init__(self, year: int, month: int, events: Sequence[Event] = None, title: str = None,
+                 events_by_date: Dict[date, List[Event]] = None):
         self.year = year
         self.month = month
         self.events = events
+        self.events_by_date = events_by_date
         self._title = title
 
     @property
@@ -55,7 +157,9 @@ class EventCalendar:
         return self._title
 
     def events_by_month_dates(self) -> List[List[DateEntry]]:
-        events_by_date = _group_by_date(self.events)
+        events_by_date = self.events_by_date
+        if events_by_date is None:
+            events_by_date = _group_by_date(self.events)
         cal = calendar.Calendar(FIRST_DAY_OF_WEEK).monthdatescalendar(self.year, self.month)
         result = []
         for week in cal:
@@ -67,12 +171,12 @@ class EventCalendar:
         return result
 
 
-def render_datetime_range(start: datetime, end: datetime, date_format: str, time_format: str) -> str:
+def render_datetime_range(event: Event, date_format: str, time_format: str) -> str:
     """
-    Render the specified start and end times into a string representing
-    their time span using the provided date and time formats.
+    Render the local start and end times of the specified event into a string
+    representing its time span using the provided date and time formats.
     """
-    start, end = timezone.localtime(start), timezone.localtime(end)
+    start, end = event.local_start, event.local_end
     start_format = f'{date_format} {time_format}'
     if start.date() == end.date():
         end_format = time_format
@@ -83,19 +187,3 @@ def render_datetime_range(start: datetime, end: datetime, date_format: str, time
         ' - ',
         end.strftime(end_format),
     ])
-
-
-def fetch_event_position_incumbents(event: Event, position_title: str) -> List[Member]:
-    """
-    Fetch the positions instances with the given title that were in effect
-    at the start time of the specified event.
-    """
-    try:
-        position_type = PositionType.objects.get(title=position_title)
-        term = Term.objects.for_date(event.start)
-        return list(Member.objects.filter(
-            position_instances__type=position_type,
-            position_instances__term=term,
-        ))
-    except (Term.DoesNotExist, PositionType.DoesNotExist):
-        return []
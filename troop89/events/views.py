@@ -8,18 +8,24 @@ from datetime import datetime
 
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.http import QueryDict
+from django.http import QueryDict, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.utils.safestring import mark_safe
 from django.utils.timezone import localtime, now
 from django.views import generic
+from django.views.decorators.http import condition
 
+from troop89.cache import cached
 from troop89.date_range.views import DayDateRangeView, MonthDateRangeView
 from troop89.json_ld.views import BreadcrumbJsonLdMixin
 from troop89.trooporg.models import Member
-from . import utils
-from .models import Event
+from troop89.trooporg.utils import fetch_incumbents
+from . import ical, utils
+from .models import Event, EventType
 from .templatetags import event_flatpage
 
 
@@ -74,19 +80,33 @@ class EventMonthView(EventBreadcrumbMixin, MonthDateRangeView):
 
 class CalendarMonthView(EventMonthView):
     template_name = 'events/calendar_month.html'
+    calendar_template_name = 'events/includes/calendar.html'
 
     def get_context_data(self, *, object_list=None, **kwargs):
-        year = self.get_year()
-        month = self.get_month()
-        if object_list is None:
-            object_list = []
-
-        calendar = utils.EventCalendar(year, month, object_list)
         context = super().get_context_data(**kwargs)
-        context['calendar'] = calendar
+        context['calendar_html'] = self.render_calendar(context)
 
         return context
 
+    def render_calendar(self, context) -> str:
+        """
+        Render the calendar grid for this view's month.
+
+        Rendered calendars are cached by month so that the month's events only
+        need to be queried when its calendar changes. See
+        ``troop89.events.signals`` for the cache invalidation logic.
+        """
+        return mark_safe(render_calendar(
+            int(self.get_year()),
+            int(self.get_month()),
+            self.calendar_template_name,
+            {
+                'month': context['month'],
+                'next_month': context['next_month'],
+                'previous_month': context['previous_month'],
+            },
+        ))
+
     def get_breadcrumbs(self):
         breadcrumbs = super().get_breadcrumbs()
 
@@ -98,6 +118,18 @@ class CalendarMonthView(EventMonthView):
         return breadcrumbs
 
 
+@cached(
+    key=lambda year, month, *args: utils.calendar_cache_key(year, month),
+    timeout=utils.CALENDAR_CACHE_TIMEOUT,
+)
+def render_calendar(year: int, month: int, template_name: str, context: dict) -> str:
+    """Render the calendar grid for the given month."""
+    return render_to_string(template_name, {
+        'calendar': utils.EventCalendar(year, month, events_by_date=utils.fetch_calendar_events(year, month)),
+        **context,
+    })
+
+
 class EventDayView(EventBreadcrumbMixin, DayDateRangeView):
     model = Event
     allow_empty = True
@@ -106,6 +138,11 @@ class EventDayView(EventBreadcrumbMixin, DayDateRangeView):
     date_field_end = 'end'
     context_object_name = 'events'
 
+    def _make_single_date_lookup(self, date):
+        # Look up the day's events by their denormalized dates, which is
+        # served by a single index.
+        return {'days__date': date}
+
     def get_breadcrumbs(self):
         breadcrumbs = super().get_breadcrumbs()
         date = datetime(self.get_year(), self.get_month(), self.get_day())
@@ -125,7 +162,7 @@ class EventDetailView(EventBreadcrumbMixin, generic.DetailView, generic.dates.Ba
     def get_breadcrumbs(self):
         breadcrumbs = super().get_breadcrumbs()
 
-        date = timezone.localdate(self.object.start)
+        date = self.object.local_start.date()
 
         breadcrumbs += self.make_common_breadcrumbs(date)
         breadcrumbs += [
@@ -150,6 +187,53 @@ class RedirectCurrentMonth(generic.RedirectView):
         return super().get_redirect_url(year=today.year, month=today.month)
 
 
+def _feed_etag(request, type_pk=None):
+    last_modified = utils.events_last_modified()
+    if last_modified is None:
+        return None
+    return '"{}-{}"'.format(type_pk or 'all', last_modified.timestamp())
+
+
+def _feed_last_modified(request, type_pk=None):
+    return utils.events_last_modified()
+
+
+@method_decorator(condition(etag_func=_feed_etag, last_modified_func=_feed_last_modified), name='get')
+class EventFeedView(generic.View):
+    """
+    iCalendar feed of all events, or of the events of a single type.
+
+    Calendar apps poll feeds frequently, so the feed is validated against the
+    time of the latest event change, which is cached (see
+    ``utils.events_last_modified``). Polls for an unchanged feed are answered
+    without querying the events. Otherwise, the feed is streamed as the
+    events are read from the database.
+    """
+    calendar_name = 'Troop 89 Medfield Events'
+
+    def get(self, request, type_pk=None):
+        events = Event.objects \
+            .select_related('type') \
+            .only('title', 'slug', 'description', 'start', 'end', 'updated_at', 'type__label') \
+            .order_by('start', 'pk')
+        name = self.calendar_name
+
+        if type_pk is not None:
+            event_type = get_object_or_404(EventType, pk=type_pk)
+            events = events.filter(type=event_type)
+            name = f'{name} - {event_type.label}'
+
+        lines = ical.serialize_calendar(
+            events.iterator(),
+            name,
+            lambda event: request.build_absolute_uri(event.get_absolute_url()),
+            request.get_host(),
+        )
+        response = StreamingHttpResponse(lines, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="events.ics"'
+        return response
+
+
 @method_decorator(staff_member_required, name='dispatch')
 class RedirectAddEventReportFlatpage(
     LoginRequiredMixin,
@@ -187,8 +271,12 @@ class RedirectAddEventReportFlatpage(
     pattern_name = 'admin:troop89_flatpages_hierarchicalflatpage_add'
     permission_required = 'troop89_flatpages.add_hierarchicalflatpage'
 
+    SPL_TITLE = 'Senior Patrol Leader'
+    ASPL_TITLE = 'Assistant Senior Patrol Leader'
+
     def get_redirect_url(self, *args, **kwargs):
         event = self.get_object()
+        incumbents = fetch_incumbents([self.SPL_TITLE, self.ASPL_TITLE], [event.start])[event.start]
         # Set up default values for flatpage form fields.
         query = QueryDict(mutable=True)
         query['url'] = event_flatpage.make_event_report_url(event)
@@ -199,13 +287,9 @@ class RedirectAddEventReportFlatpage(
             # Refetch the user as a Member instance to access safe display logic
             user=Member.objects.get(pk=self.request.user.pk).get_safe_display(),
             post_date=timezone.now().strftime(self.DATE_FORMAT),
-            event_date=utils.render_datetime_range(event.start, event.end, self.DATE_FORMAT, self.TIME_FORMAT),
-            spl=_render_incumbent_names(
-                utils.fetch_event_position_incumbents(event, 'Senior Patrol Leader')
-            ),
-            aspl=_render_incumbent_names(
-                utils.fetch_event_position_incumbents(event, 'Assistant Senior Patrol Leader')
-            ),
+            event_date=utils.render_datetime_range(event, self.DATE_FORMAT, self.TIME_FORMAT),
+            spl=_render_incumbent_names(incumbents[self.SPL_TITLE]),
+            aspl=_render_incumbent_names(incumbents[self.ASPL_TITLE]),
         )
         return ''.join([
             # Do not include the args when calling the parent method since
@@ -5,3 +5,7 @@ class FlatpagesConfig(AppConfig):
     name = 'troop89.flatpages'
     label = 'troop89_flatpages'
     verbose_name = 'Flat Pages'
+
+    def ready(self):
+        # Register signal receivers
+        from . import signals  # noqa: F401
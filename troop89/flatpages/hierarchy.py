@@ -0,0 +1,154 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Materialized flatpage hierarchies.
+
+Resolving the hierarchy of flatpages with the database requires ``url__regex``
+queries, which cannot make use of an index. Instead, the flatpages of each
+site are loaded once into a prefix tree, which is cached until a flatpage
+changes or, since other processes may not see that change, until it expires.
+See ``troop89.flatpages.signals`` for the cache invalidation logic.
+"""
+
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.sites.models import Site
+
+from troop89.cache import cached, expire_on_commit
+from .models import HierarchicalFlatPage
+
+TREE_CACHE_KEY_FORMAT = 'flatpages.tree.{}'
+
+TREE_CACHE_TIMEOUT = 5 * 60
+
+# Only the fields needed to link to pages are kept in the tree.
+TREE_PAGE_FIELDS = ('id', 'url', 'title', 'registration_required')
+
+
+class FlatPageTree:
+    """
+    Prefix tree of flatpages keyed by the segments of their urls.
+
+    Every lookup walks at most the depth of the requested url, with the
+    exception of ``children_for_url``, which visits the requested subtree.
+    """
+
+    class Node:
+        """A url in the hierarchy, which may or may not have a flatpage."""
+
+        def __init__(self, url: str):
+            self.url = url
+            self.page: Optional[HierarchicalFlatPage] = None
+            self.children: Dict[str, 'FlatPageTree.Node'] = {}
+
+    def __init__(self, pages: Iterable[HierarchicalFlatPage] = ()):
+        self.root = self.Node('/')
+        for page in pages:
+            self.insert(page)
+
+    def insert(self, page: HierarchicalFlatPage):
+        """Add the given page to this tree."""
+        node = self.root
+        for segment in _split_url(page.url):
+            try:
+                node = node.children[segment]
+            except KeyError:
+                node.children[segment] = node = self.Node(f'{node.url}{segment}/')
+        node.page = page
+
+    def find(self, url: str) -> Optional[Node]:
+        """Return the node for the given url, or None if no such node exists."""
+        node = self.root
+        for segment in _split_url(url):
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def get_page(self, url: str) -> Optional[HierarchicalFlatPage]:
+        """Return the flatpage with the given url, or None if no such page exists."""
+        node = self.find(url)
+        return node.page if node else None
+
+    def children_for_url(self, url: str, depth: int = None, include_parents: bool = True,
+                         include_private: bool = True) -> List[HierarchicalFlatPage]:
+        """
+        Return the flatpages which are the logical children of the given url,
+        ordered by url.
+
+        Mirrors ``HierarchicalFlatPage.objects.children_for_url``.
+        """
+        node = self.find(url)
+        if node is None:
+            return []
+
+        pages = []
+
+        def visit(parent: FlatPageTree.Node, level: int):
+            for child in parent.children.values():
+                if child.page and _visible(child.page, include_private) \
+                        and (include_parents or not depth or level == depth):
+                    pages.append(child.page)
+                if not depth or level < depth:
+                    visit(child, level + 1)
+
+        visit(node, 1)
+        return sorted(pages, key=attrgetter('url'))
+
+    def parent_pages(self, url: str, include_private: bool = True) -> List[HierarchicalFlatPage]:
+        """
+        Return the flatpages which are the logical parents of the given url,
+        deepest first.
+        """
+        pages = []
+        node = self.root
+        for segment in _split_url(url)[:-1]:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.page and _visible(node.page, include_private):
+                pages.append(node.page)
+        pages.reverse()
+        return pages
+
+    def related_pages(self, page: HierarchicalFlatPage,
+                      include_private: bool = True) -> List[HierarchicalFlatPage]:
+        """
+        Return the flatpages with the same logical parent as the given page,
+        ordered by url.
+        """
+        parent = self.find('/'.join(_split_url(page.url)[:-1]))
+        if parent is None:
+            return []
+        return sorted(
+            (child.page for child in parent.children.values()
+             if child.page and child.page.pk != page.pk and _visible(child.page, include_private)),
+            key=attrgetter('url'),
+        )
+
+
+@cached(key=TREE_CACHE_KEY_FORMAT.format, timeout=TREE_CACHE_TIMEOUT)
+def get_flatpage_tree(site_id: int) -> FlatPageTree:
+    """Return the flatpage tree for the given site, building it if necessary."""
+    pages = HierarchicalFlatPage.objects.filter(sites__id=site_id).only(*TREE_PAGE_FIELDS)
+    return FlatPageTree(pages)
+
+
+def clear_flatpage_trees():
+    """Expire the cached flatpage trees of every site, and again once the current transaction commits."""
+    site_ids = Site.objects.values_list('pk', flat=True)
+    expire_on_commit(*(TREE_CACHE_KEY_FORMAT.format(pk) for pk in site_ids))
+
+
+def _split_url(url: str) -> List[str]:
+    """Return the non-empty segments of the given url."""
+    return [segment for segment in url.split('/') if segment]
+
+
+def _visible(page: HierarchicalFlatPage, include_private: bool) -> bool:
+    return include_private or not page.registration_required
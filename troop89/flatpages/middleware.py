@@ -7,7 +7,9 @@
 from django.conf import settings
 from django.http import Http404
 from django.contrib.flatpages.middleware import FlatpageFallbackMiddleware
+from django.contrib.sites.shortcuts import get_current_site
 
+from .hierarchy import get_flatpage_tree
 from .views import hierarchical_flatpage
 
 
@@ -15,12 +17,21 @@ class HierarchicalFlatpageFallbackMiddleware(FlatpageFallbackMiddleware):
     """
     Copy of the standard flatpage middleware that modifies that CSP header for
     flatpage views.
+
+    Urls that do not belong to any flatpage are rejected using the cached
+    flatpage tree of the current site, so that the many 404s for unknown urls
+    do not query the database. A flatpage created by another process may be
+    missing from the tree until it expires, so it may 404 for up to
+    ``TREE_CACHE_TIMEOUT`` seconds unless the cache is shared between
+    processes.
     """
 
     def process_response(self, request, response):
         if response.status_code != 404:
             return response  # No need to check for a flatpage for non-404 responses.
         try:
+            if not _has_flatpage(request):
+                return response
             return hierarchical_flatpage(request, request.path_info)
         # Return the original response if any errors happened. Because this
         # is a middleware, we can't assume the errors will be caught elsewhere.
@@ -30,3 +41,14 @@ class HierarchicalFlatpageFallbackMiddleware(FlatpageFallbackMiddleware):
             if settings.DEBUG:
                 raise
             return response
+
+
+def _has_flatpage(request) -> bool:
+    """
+    Return True if a flatpage may be served for the given request, either
+    directly or by redirecting to the url with an appended slash.
+    """
+    # The tree ignores trailing slashes, so this also finds the flatpage
+    # that the view would redirect to
+    tree = get_flatpage_tree(get_current_site(request).id)
+    return tree.get_page(request.path_info) is not None
@@ -87,6 +87,18 @@ class HierarchicalFlatPage(FlatPage):
 
         return HierarchicalFlatPage.objects.filter(url__in=parents).order_by(Length('url').desc())
 
+    @cached_property
+    def ancestor_pages(self):
+        """
+        Return the flatpages which are the logical parents of this page, deepest first.
+
+        Unlike ``parent_pages``, the parents are resolved from the current
+        site's cached flatpage tree rather than by querying the database.
+        """
+        from .hierarchy import get_flatpage_tree
+
+        return get_flatpage_tree(settings.SITE_ID).parent_pages(self.url)
+
     def children_pages(self, depth: int = 1, include_parents: bool = True):
         """
         Return the flatpages which are the logical children of this page.
@@ -100,7 +112,7 @@ class HierarchicalFlatPage(FlatPage):
         protocol = 'https' if settings.SECURE_SSL_REDIRECT else 'http'
         item_list = []
 
-        for position, page in enumerate(reversed(self.parent_pages), start=1):
+        for position, page in enumerate(reversed(self.ancestor_pages), start=1):
             item_list.append({
                 "@type": "ListItem",
                 "position": position,
@@ -111,7 +123,7 @@ class HierarchicalFlatPage(FlatPage):
             })
         item_list.append({
                 "@type": "ListItem",
-                "position": len(self.parent_pages) + 1,
+                "position": len(self.ancestor_pages) + 1,
                 "name": self.title,
                 "item": f'{protocol}://{domain}{self.url}',
             })
@@ -0,0 +1,28 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Signal receivers that keep the flatpages app's caches consistent with the
+database.
+"""
+
+from django.contrib.flatpages.models import FlatPage
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .hierarchy import clear_flatpage_trees
+from .models import HierarchicalFlatPage
+
+
+# Flatpages may be saved either as standard or as hierarchical flatpages.
+@receiver(post_save, sender=FlatPage)
+@receiver(post_save, sender=HierarchicalFlatPage)
+@receiver(post_delete, sender=FlatPage)
+@receiver(post_delete, sender=HierarchicalFlatPage)
+@receiver(m2m_changed, sender=FlatPage.sites.through)
+def clear_flatpage_caches(sender, **kwargs):
+    """Discard the cached flatpage trees whenever a flatpage changes."""
+    clear_flatpage_trees()
@@ -14,6 +14,7 @@ from django.conf import settings
 from django.contrib.sites.models import Site
 from django.contrib.sites.shortcuts import get_current_site
 
+from ..hierarchy import get_flatpage_tree
 from ..models import HierarchicalFlatPage
 
 register = template.Library()
@@ -33,18 +34,12 @@ def render_related_pages(page: HierarchicalFlatPage, user=None):
     """
     current_site = Site.objects.get_current()
 
-    flatpages = HierarchicalFlatPage.objects.filter(sites__id=current_site.pk)
-
     # If the provided user is not authenticated, or no user
     # was provided, filter the list to only public flatpages.
-    if user:
-        if not user.is_authenticated:
-            flatpages = flatpages.filter(registration_required=False)
-    else:
-        flatpages = flatpages.filter(registration_required=False)
+    include_private = bool(user and user.is_authenticated)
 
     return {
-        'related_pages': flatpages.related_to(page),
+        'related_pages': get_flatpage_tree(current_site.pk).related_pages(page, include_private),
         'current_page': page,
     }
 
@@ -92,21 +87,18 @@ class HierarchicalFlatpageTemplateNode(template.Node):
         else:
             depth = None
 
-        flatpages = HierarchicalFlatPage.objects.children_for_url(
-            url=lookup_url,
-            depth=depth,
-        )
-
-        flatpages = flatpages.filter(sites__id=site_pk)
-
         # If the provided user is not authenticated, or no user
         # was provided, filter the list to only public flatpages.
         if self.user:
-            user = self.user.resolve(context)
-            if not user.is_authenticated:
-                flatpages = flatpages.filter(registration_required=False)
+            include_private = self.user.resolve(context).is_authenticated
         else:
-            flatpages = flatpages.filter(registration_required=False)
+            include_private = False
+
+        flatpages = get_flatpage_tree(site_pk).children_for_url(
+            url=lookup_url,
+            depth=depth,
+            include_private=include_private,
+        )
 
         context[self.context_name] = list(_make_page_hierarchy(
             ordered_children=flatpages,
@@ -4,12 +4,19 @@
 #  License, v. 2.0. If a copy of the MPL was not distributed with this
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import unittest
+from unittest import mock
+
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db import connection
 from django.template import Context, Template
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from troop89.auth.models import User
+from .hierarchy import TREE_CACHE_KEY_FORMAT, FlatPageTree, get_flatpage_tree
 from .models import HierarchicalFlatPage
 from .templatetags.flatpage_hierarchy import _make_page_hierarchy
 
@@ -118,6 +125,9 @@ class HierarchicalFlatPageTemplateTagTests(TestCase):
             page.sites.set([cls.site])
             page.save()
 
+    def setUp(self):
+        cache.clear()
+
     def test_make_page_hierarchy_builds_correct_tree(self):
         page_tree = list(_make_page_hierarchy(self.flatpages[1:], '/about/'))
 
@@ -410,3 +420,138 @@ class HierarchicalFlatPageTemplateTagTests(TestCase):
         # Note no entry for /merit-badges/ since no base page exists
         expected = "/about/contact/"
         self.assertEqual(out, expected)
+
+
+class FlatPageTreeTests(unittest.TestCase):
+    def setUp(self):
+        self.flatpages = [
+            HierarchicalFlatPage(pk=pk, url=url, registration_required=private)
+            for pk, (url, private) in enumerate([
+                ('/about/', False),
+                ('/about/contact/', False),
+                ('/about/contact/scoutmaster/', False),
+                ('/about/contact/webmaster/', False),
+                ('/about/merit-badges/bird-study/', False),
+                ('/about/merit-badges/cooking/', False),
+                ('/about/private/', True),
+            ], start=1)
+        ]
+        self.tree = FlatPageTree(self.flatpages)
+
+    def test_children_for_url_depth_1(self):
+        self.assertEqual(
+            self.tree.children_for_url('/about/', depth=1),
+            [self.flatpages[1], self.flatpages[6]],
+        )
+
+    def test_children_for_url_depth_2_ignore_parents(self):
+        self.assertEqual(
+            self.tree.children_for_url('/about/', depth=2, include_parents=False),
+            self.flatpages[2:6],
+        )
+
+    def test_children_for_url_excludes_private_pages(self):
+        self.assertEqual(
+            self.tree.children_for_url('/about/', include_private=False),
+            self.flatpages[1:6],
+        )
+
+    def test_children_for_missing_url(self):
+        self.assertEqual(self.tree.children_for_url('/missing/'), [])
+
+    def test_parent_pages_with_partial_parents(self):
+        self.assertEqual(self.tree.parent_pages('/about/merit-badges/cooking/'), [self.flatpages[0]])
+
+    def test_parent_pages_deepest_first(self):
+        self.assertEqual(
+            self.tree.parent_pages('/about/contact/scoutmaster/'),
+            [self.flatpages[1], self.flatpages[0]],
+        )
+
+    def test_related_pages(self):
+        self.assertEqual(
+            self.tree.related_pages(self.flatpages[2]),
+            [self.flatpages[3]],
+        )
+        self.assertEqual(
+            self.tree.related_pages(self.flatpages[1], include_private=False),
+            [],
+        )
+
+    def test_get_page(self):
+        self.assertEqual(self.tree.get_page('/about/contact'), self.flatpages[1])
+        self.assertIsNone(self.tree.get_page('/about/merit-badges/'))
+
+
+class FlatPageTreeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.site = Site.objects.get(pk=1)
+        self.about_page = HierarchicalFlatPage.objects.create(url='/about/', title='About')
+        self.about_page.sites.set([self.site])
+
+    def test_tree_cached(self):
+        get_flatpage_tree(self.site.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_flatpage_tree(self.site.pk).get_page('/about/'), self.about_page)
+
+    def test_tree_rebuilt_on_flatpage_change(self):
+        self.assertIsNone(get_flatpage_tree(self.site.pk).get_page('/about/contact/'))
+
+        contact_page = HierarchicalFlatPage.objects.create(url='/about/contact/', title='Contact')
+        contact_page.sites.set([self.site])
+
+        self.assertEqual(get_flatpage_tree(self.site.pk).get_page('/about/contact/'), contact_page)
+
+        contact_page.delete()
+
+        self.assertIsNone(get_flatpage_tree(self.site.pk).get_page('/about/contact/'))
+
+    def test_tree_expires(self):
+        get_flatpage_tree(self.site.pk)
+        self.assertIsNotNone(cache.get(TREE_CACHE_KEY_FORMAT.format(self.site.pk)).expires_at)
+
+    def test_tree_expired_on_commit(self):
+        with mock.patch('troop89.cache.transaction.on_commit') as on_commit:
+            contact_page = HierarchicalFlatPage.objects.create(url='/about/contact/', title='Contact')
+            contact_page.sites.set([self.site])
+        # Another worker caches the tree before the transaction commits
+        get_flatpage_tree(self.site.pk)
+        on_commit.call_args[0][0]()
+        with self.assertNumQueries(1):
+            get_flatpage_tree(self.site.pk)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class FlatPageFallbackMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.site = Site.objects.get(pk=1)
+        self.about_page = HierarchicalFlatPage.objects.create(url='/about/', title='About', content='About us')
+        self.about_page.sites.set([self.site])
+
+    def flatpage_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [query for query in queries if 'flatpage' in query['sql']]
+
+    def test_unknown_url_without_queries(self):
+        get_flatpage_tree(self.site.pk)
+        response, queries = self.flatpage_queries('/wp-login.php')
+        self.assertEqual(response.status_code, 404)
+        self.assertListEqual(queries, [])
+
+    def test_flatpage_served(self):
+        self.assertContains(self.client.get('/about/'), 'About us')
+
+    @override_settings(APPEND_SLASH=True)
+    def test_flatpage_redirect_with_slash(self):
+        self.assertRedirects(self.client.get('/about'), '/about/', status_code=301)
+
+    def test_urls_refreshed_on_flatpage_change(self):
+        self.assertEqual(self.client.get('/contact/').status_code, 404)
+
+        contact_page = HierarchicalFlatPage.objects.create(url='/contact/', title='Contact', content='Call us')
+        contact_page.sites.set([self.site])
+
+        self.assertContains(self.client.get('/contact/'), 'Call us')
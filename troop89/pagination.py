@@ -0,0 +1,203 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Keyset (or "seek") pagination for date-based list views.
+
+Django's paginator selects each page with an OFFSET and counts every item to
+determine the number of pages, so deep pages become more expensive as the
+number of items grows. Keyset pagination instead selects the items that sort
+after (or before) a cursor identifying the last item of the previous page,
+which the database can seek to with an index on the date field and the
+primary key.
+
+Views using ``DateKeysetPaginationMixin`` switch to keyset pagination when
+they are requested with an ``after`` or ``before`` cursor. Pages requested
+by number are still paginated with an offset, but link to their neighboring
+pages with cursors, so that visitors walking the whole list only ever request
+pages by cursor. A cursor must identify an item of the list, so that pages
+for arbitrary cursors are never rendered (nor cached).
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Optional, Sequence, Tuple
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils import timezone
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Largest primary key that any database accepts in a lookup
+_MAX_PK = 2 ** 63 - 1
+
+
+def encode_cursor(moment: datetime, pk: int) -> str:
+    """Return a cursor identifying an item with the given date and primary key."""
+    # Dates are encoded as whole microseconds to avoid any rounding errors
+    return f'{(moment - _EPOCH) // timedelta(microseconds=1)}.{pk}'
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Return the date and primary key identified by the given cursor.
+
+    Raise ValueError if the cursor is malformed or out of range.
+    """
+    microseconds, pk = cursor.split('.')
+    try:
+        moment = _EPOCH + timedelta(microseconds=int(microseconds))
+    except OverflowError:
+        raise ValueError(f'Cursor date out of range: {cursor}')
+    pk = int(pk)
+    if not 0 <= pk <= _MAX_PK:
+        raise ValueError(f'Cursor key out of range: {cursor}')
+    return moment, pk
+
+
+class CursorPageMixin:
+    """Page mixin that provides cursors for a page's neighboring pages."""
+
+    object_list: Sequence[Any]
+    cursor_field: str
+
+    def _cursor(self, obj) -> str:
+        return encode_cursor(getattr(obj, self.cursor_field), obj.pk)
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        """Return the cursor that selects the page before this one."""
+        return self._cursor(self.object_list[0]) if self.object_list else None
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """Return the cursor that selects the page after this one."""
+        return self._cursor(self.object_list[-1]) if self.object_list else None
+
+
+class CursorPage(CursorPageMixin, Page):
+    """A page selected by number that provides cursors for its neighbors."""
+
+    def __init__(self, object_list, number, paginator):
+        super().__init__(object_list, number, paginator)
+        # Cursors are computed from the page's items, so evaluate them once
+        self.object_list = list(object_list)
+        self.cursor_field = paginator.cursor_field
+
+
+class CursorPaginator(Paginator):
+    """Paginator whose pages provide cursors for their neighboring pages."""
+
+    def __init__(self, *args, cursor_field: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_field = cursor_field
+
+    def _get_page(self, *args, **kwargs):
+        return CursorPage(*args, **kwargs)
+
+
+class KeysetPage(CursorPageMixin):
+    """
+    A page selected by a cursor.
+
+    Keyset pages do not know their number or the total number of pages.
+    """
+    number = None
+    paginator = None
+
+    def __init__(self, object_list: Sequence[Any], cursor_field: str, has_previous: bool, has_next: bool):
+        self.object_list = object_list
+        self.cursor_field = cursor_field
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return '<Keyset page>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_other_pages(self) -> bool:
+        return self._has_previous or self._has_next
+
+
+def keyset_filter(date_field: str, moment: datetime, pk: int, after: bool) -> Q:
+    """
+    Return the filter that selects the items sorting after the cursor (older
+    items) if ``after`` is True, or before the cursor (newer items)
+    otherwise, including the item that the cursor identifies.
+    """
+    if after:
+        # The redundant bound on the date lets the database seek to the
+        # cursor in the index rather than scan to it from the newest item.
+        # The OR breaks ties between items with the same date.
+        return Q(**{f'{date_field}__lte': moment}) & (
+            Q(**{f'{date_field}__lt': moment}) | Q(**{date_field: moment, 'pk__lte': pk})
+        )
+    return Q(**{f'{date_field}__gte': moment}) & (
+        Q(**{f'{date_field}__gt': moment}) | Q(**{date_field: moment, 'pk__gte': pk})
+    )
+
+
+class DateKeysetPaginationMixin:
+    """
+    Mixin for date-based list views that orders their items by date
+    descending and paginates them with cursors when one is given.
+
+    Items with the same date are ordered by their primary key.
+    """
+    paginator_class = CursorPaginator
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        kwargs.setdefault('cursor_field', self.get_date_field())
+        return super().get_paginator(queryset, per_page, orphans, allow_empty_first_page, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        date_field = self.get_date_field()
+        queryset = queryset.order_by(f'-{date_field}', '-pk')
+
+        after = self.request.GET.get('after')
+        before = self.request.GET.get('before')
+        if after is None and before is None:
+            return super().paginate_queryset(queryset, page_size)
+
+        try:
+            moment, pk = decode_cursor(after if after is not None else before)
+        except ValueError:
+            raise Http404('Invalid cursor.')
+
+        # Fetch the item identified by the cursor, which sorts first, along
+        # with one extra item to learn whether there is another page
+        if after is not None:
+            object_list = list(queryset.filter(keyset_filter(date_field, moment, pk, after=True))[:page_size + 2])
+        else:
+            object_list = list(
+                queryset.reverse().filter(keyset_filter(date_field, moment, pk, after=False))[:page_size + 2]
+            )
+
+        if not object_list or object_list[0].pk != pk or getattr(object_list[0], date_field) != moment:
+            raise Http404('Invalid cursor.')
+        object_list = object_list[1:]
+
+        if after is not None:
+            has_previous, has_next = True, len(object_list) > page_size
+            object_list = object_list[:page_size]
+        else:
+            has_previous, has_next = len(object_list) > page_size, True
+            object_list = object_list[:page_size][::-1]
+
+        page = KeysetPage(object_list, date_field, has_previous, has_next)
+        return None, page, page.object_list, True
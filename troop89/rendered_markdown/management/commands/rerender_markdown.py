@@ -0,0 +1,38 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from troop89.rendered_markdown.models import RenderedMarkdownModel
+
+
+class Command(BaseCommand):
+    help = "Re-render the stored HTML of every markdown field."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of instances to update per query.",
+        )
+
+    def handle(self, *args, batch_size, **options):
+        for model in apps.get_models():
+            if not issubclass(model, RenderedMarkdownModel):
+                continue
+
+            fields = list(model.rendered_markdown_fields)
+            html_fields = list(model.rendered_markdown_fields.values())
+
+            # Update the rendered HTML in bulk so that other fields
+            # (e.g. modification times) are left untouched.
+            changed = []
+            for instance in model._default_manager.only('pk', *fields, *html_fields).iterator():
+                if instance.render_markdown():
+                    changed.append(instance)
+            model._default_manager.bulk_update(changed, html_fields, batch_size=batch_size)
+
+            self.stdout.write(f"Re-rendered {len(changed)} {model._meta.verbose_name_plural}.")
@@ -0,0 +1,62 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from typing import Dict
+
+from django.db import models
+from markdownx.utils import markdownify
+
+
+class RenderedMarkdownModel(models.Model):
+    """
+    Abstract model that stores the rendered HTML of its markdown fields
+    alongside their source.
+
+    The HTML is rendered whenever an instance is saved, so that displaying an
+    instance never has to run the markdown pipeline. Run the
+    ``rerender_markdown`` management command after changing
+    ``MARKDOWNX_MARKDOWN_EXTENSIONS``.
+    """
+
+    # Map from the name of each markdown field to the name of the field
+    # that stores its rendered HTML.
+    rendered_markdown_fields: Dict[str, str] = {}
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            update_fields.update(
+                html_field for field, html_field in self.rendered_markdown_fields.items()
+                if field in update_fields
+            )
+        self.render_markdown()
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def render_markdown(self) -> bool:
+        """
+        Re-render the markdown fields of this instance.
+
+        Return True if any of the stored HTML changed.
+        """
+        changed = False
+        for field, html_field in self.rendered_markdown_fields.items():
+            html = markdownify(getattr(self, field))
+            if html != getattr(self, html_field):
+                setattr(self, html_field, html)
+                changed = True
+        return changed
+
+    def get_rendered_markdown(self, field: str) -> str:
+        """Return the rendered HTML of the given markdown field."""
+        html = getattr(self, self.rendered_markdown_fields[field])
+        if not html and getattr(self, field):
+            # Instances that were created without calling save (e.g. from
+            # fixtures) will not have been rendered yet.
+            html = markdownify(getattr(self, field))
+        return html
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
     'troop89.auth.apps.AuthConfig',
     'troop89.events.apps.EventsConfig',
     'troop89.date_range.apps.DateRangeConfig',
+    'troop89.rendered_markdown.apps.RenderedMarkdownConfig',
     'troop89.trooporg.apps.TroopOrgConfig',
     'troop89.announcements.apps.AnnouncementsConfig',
     'troop89.flatpages.apps.FlatpagesConfig',
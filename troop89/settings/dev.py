@@ -14,6 +14,7 @@ ALLOWED_HOSTS = [
 ] + SECRETS.get('ALLOWED_HOSTS', [])
 
 INSTALLED_APPS += [
+    'troop89.benchmarks.apps.BenchmarksConfig',
     'debug_toolbar',
 ]
 
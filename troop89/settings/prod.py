@@ -26,3 +26,36 @@ SECURE_HSTS_PRELOAD = True
 # CommonMiddleware settings
 
 PREPEND_WWW = True
+
+# Template settings
+#
+# Templates are loaded from the cached loader so that each template, along
+# with the templates it includes, is only read and compiled once per process.
+# APP_DIRS must be disabled when the loaders are configured explicitly.
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Cache settings
+#
+# A per-process local-memory cache is used by default. Another backend, such
+# as a file-based or Redis cache shared between processes, can be configured
+# under CACHES in the secrets file. See the deployment docs for examples.
+
+CACHES = SECRETS.get('CACHES', {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'troop89',
+    },
+})
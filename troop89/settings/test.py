@@ -0,0 +1,13 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Tests and benchmarks run against the production configuration, along with
+# the tools used to measure it.
+from .prod import *
+
+INSTALLED_APPS += [
+    'troop89.benchmarks.apps.BenchmarksConfig',
+]
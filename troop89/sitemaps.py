@@ -0,0 +1,123 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Site-wide sitemap configuration.
+
+The sitemap is served as a sitemap index that links to a (paginated) sitemap
+for each section. Rendered sitemaps are cached and support conditional GET
+requests, so crawlers re-fetching an unchanged sitemap do not cause it to
+be regenerated.
+
+A section may provide a ``get_latest_lastmod()`` method that returns the last
+time that any of its items changed. Cached copies of these sections are
+replaced as soon as they change, while cached copies of any other section
+expire after ``SITEMAP_CACHE_TIMEOUT`` seconds.
+"""
+
+import functools
+from datetime import datetime
+from typing import Optional
+
+from django.contrib.flatpages.sitemaps import FlatPageSitemap
+from django.contrib.sitemaps import views as sitemap_views
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from troop89.announcements.sitemaps import AnnouncementSitemap
+from troop89.events.sitemaps import EventSitemap
+from troop89.trooporg.sitemaps import PatrolSitemap, TermSitemap
+
+SITEMAP_CACHE_TIMEOUT = 60 * 60
+
+sitemaps = {
+    'events': EventSitemap,
+    'announcements': AnnouncementSitemap,
+    'terms': TermSitemap,
+    'patrols': PatrolSitemap,
+    'flatpages': FlatPageSitemap,
+}
+
+
+def get_latest_lastmod(sitemaps: dict, section: str = None) -> Optional[datetime]:
+    """
+    Return the last time that the given sitemap section, or any section if
+    no section is given, was modified.
+
+    Return None if the time cannot be determined.
+    """
+    if section is None:
+        sections = sitemaps.values()
+    elif section in sitemaps:
+        sections = [sitemaps[section]]
+    else:
+        return None
+
+    latest = []
+    for site in sections:
+        if callable(site):
+            site = site()
+        try:
+            lastmod = site.get_latest_lastmod()
+        except AttributeError:
+            return None
+        if lastmod is None:
+            return None
+        latest.append(lastmod)
+    return max(latest)
+
+
+def _last_modified(request, sitemaps, section=None, **kwargs):
+    return get_latest_lastmod(sitemaps, section)
+
+
+def cache_sitemap(view):
+    """
+    Decorate the given sitemap view to serve cached responses and to respond
+    to conditional GET requests.
+    """
+
+    @condition(last_modified_func=_last_modified)
+    @functools.wraps(view)
+    def wrapper(request, sitemaps, section=None, **kwargs):
+        if section is not None:
+            kwargs['section'] = section
+
+        page = request.GET.get('p', '1')
+        if not page.isdigit():
+            # Let the view handle invalid pages
+            return view(request, sitemaps, **kwargs)
+
+        lastmod = get_latest_lastmod(sitemaps, section)
+        # Sitemaps contain absolute urls, which depend on the site and scheme
+        cache_key = 'sitemap.{}.{}.{}.{}.{}'.format(
+            get_current_site(request).pk,
+            request.scheme,
+            section or 'index',
+            page,
+            lastmod.timestamp() if lastmod else '',
+        )
+
+        response = cache.get(cache_key)
+        if response is None:
+            response = view(request, sitemaps, **kwargs)
+            response.render()
+            cache.set(cache_key, response, SITEMAP_CACHE_TIMEOUT)
+
+        if lastmod is not None:
+            # The sitemap view only accounts for the items that still exist,
+            # which is not enough to validate conditional requests
+            response['Last-Modified'] = http_date(lastmod.timestamp())
+        return response
+
+    return wrapper
+
+
+index = cache_sitemap(sitemap_views.index)
+
+sitemap = cache_sitemap(sitemap_views.sitemap)
@@ -0,0 +1,199 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import datetime
+import unittest
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from troop89 import cache as troop89_cache, pagination
+from troop89.announcements.models import Announcement
+from troop89.events.models import Event, EventDay
+from troop89.trooporg.models import Member, PositionInstance, Term
+
+
+class GetOrComputeTest(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.compute = mock.Mock(side_effect=range(100))
+
+    def get(self, **kwargs):
+        return troop89_cache.get_or_compute('test', self.compute, **{'timeout': 60, **kwargs})
+
+    def test_value_cached(self):
+        self.assertEqual(self.get(), 0)
+        self.assertEqual(self.get(), 0)
+        self.compute.assert_called_once()
+
+    def test_expired_value_recomputed(self):
+        self.get()
+        troop89_cache.expire('test')
+        self.assertEqual(self.get(), 1)
+
+    def test_stale_value_served_while_locked(self):
+        self.get()
+        troop89_cache.expire('test')
+        cache.add('test.lock', True)
+        self.assertEqual(self.get(), 0)
+        self.compute.assert_called_once()
+
+    def test_expired_while_computing(self):
+        def compute():
+            # Another worker expires the value before it has been cached
+            troop89_cache.expire('test')
+            return self.compute()
+
+        self.assertEqual(self.get(), 0)
+        troop89_cache.expire('test')
+        self.assertEqual(troop89_cache.get_or_compute('test', compute, timeout=60), 1)
+        self.assertEqual(self.get(), 2)
+
+    def test_generation_evicted(self):
+        self.get()
+        cache.delete('test.generation')
+        self.assertEqual(self.get(), 1)
+
+    def test_early_expiration(self):
+        self.get()
+        # A value that took a very long time to compute is always refreshed
+        entry = cache.get('test')
+        cache.set('test', entry._replace(delta=10 ** 6))
+        self.assertEqual(self.get(), 1)
+
+    def test_decorator_expire(self):
+        @troop89_cache.cached(key='test.{}'.format, timeout=None)
+        def square(n):
+            self.compute()
+            return n * n
+
+        self.assertEqual(square(3), 9)
+        square(3)
+        square.expire(3)
+        square(3)
+        self.assertEqual(self.compute.call_count, 2)
+
+
+class CursorTest(SimpleTestCase):
+
+    def test_round_trip(self):
+        moment = datetime.datetime(2019, 6, 9, 17, 56, 1, 999999, tzinfo=timezone.utc)
+        self.assertEqual(pagination.decode_cursor(pagination.encode_cursor(moment, 42)), (moment, 42))
+
+    def test_malformed_cursor(self):
+        for cursor in ('', '1', '1.2.3', 'a.b', '999999999999999999999.1', '-999999999999999999999.1',
+                       '1.99999999999999999999', '1.-1'):
+            with self.assertRaises(ValueError):
+                pagination.decode_cursor(cursor)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class HomePageCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = Member.objects.create(username='author', first_name='A', last_name='Uthor')
+        self.announcement = Announcement.objects.create(
+            title='Spring Camporee',
+            slug='spring-camporee',
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            content='See you there!',
+            author=self.author,
+        )
+
+    def test_page_cached_for_visitors(self):
+        self.assertContains(self.client.get('/'), 'Spring Camporee')
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get('/'), 'Spring Camporee')
+
+    def test_page_not_cached_for_staff(self):
+        staff = Member.objects.create(username='staff', is_staff=True)
+        self.client.get('/')
+        self.client.force_login(staff)
+
+        # Change the announcement without invalidating the cached page
+        Announcement.objects.filter(pk=self.announcement.pk).update(title='Fall Camporee')
+        self.assertContains(self.client.get('/'), 'Fall Camporee')
+
+    def test_page_invalidated_on_announcement_change(self):
+        self.client.get('/')
+
+        self.announcement.title = 'Fall Camporee'
+        self.announcement.save()
+
+        self.assertContains(self.client.get('/'), 'Fall Camporee')
+
+    def test_stale_page_served_while_regenerating(self):
+        self.client.get('/')
+        self.announcement.title = 'Fall Camporee'
+        self.announcement.save()
+
+        # Pretend that another worker is already rendering the page
+        with mock.patch.object(cache, 'add', return_value=False):
+            self.assertContains(self.client.get('/'), 'Spring Camporee')
+        self.assertContains(self.client.get('/'), 'Fall Camporee')
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Query plans are only checked on PostgreSQL')
+class QueryPlanTest(TestCase):
+    """
+    Check that the site's hot queries are able to use an index.
+
+    The test tables are far too small for the planner to prefer an index over
+    a sequential scan, so sequential scans are disabled for each test. If a
+    query is still planned without an index scan, it has no usable index.
+    """
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            # Reverted when the test's transaction is rolled back
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        self.now = timezone.now()
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        self.assertRegex(plan, r'Index (Only )?Scan', f'No index scan in the plan:\n{plan}')
+
+    def test_published_announcements(self):
+        self.assertUsesIndex(Announcement.objects.published().order_by('-pub_date', '-id')[:5])
+
+    def test_announcement_keyset_page(self):
+        # The query made by DateKeysetPaginationMixin for an 'after' cursor.
+        # The published announcements are not selected, since that filter
+        # would bound the index scan by itself.
+        queryset = Announcement.objects \
+            .order_by('-pub_date', '-pk') \
+            .filter(pagination.keyset_filter('pub_date', self.now, 1, after=True))[:7]
+        plan = queryset.explain()
+        # The cursor must bound the scan of the index, rather than only
+        # filter the rows that the scan visits
+        self.assertRegex(plan, r'Index (Only )?Scan( Backward)? using announcemen_pub_dat_baebde_idx', plan)
+        self.assertRegex(plan, r'Index Cond: .*pub_date <=', plan)
+
+    def test_announcement_months(self):
+        self.assertUsesIndex(Announcement.objects.published().dates('pub_date', 'month'))
+
+    def test_next_publication(self):
+        self.assertUsesIndex(Announcement.objects.filter(pub_date__gt=self.now).order_by('pub_date')[:1])
+
+    def test_upcoming_events(self):
+        until = self.now + datetime.timedelta(days=7)
+        self.assertUsesIndex(Event.objects.filter(start__lte=until, end__gte=self.now))
+
+    def test_calendar_event_days(self):
+        today = self.now.date()
+        self.assertUsesIndex(EventDay.objects.filter(date__range=(today, today + datetime.timedelta(days=42))))
+
+    def test_term_for_date(self):
+        today = self.now.date()
+        self.assertUsesIndex(Term.objects.filter(start__lte=today, end__gt=today))
+
+    def test_position_incumbents(self):
+        self.assertUsesIndex(PositionInstance.objects.filter(term_id=1, type_id=1))
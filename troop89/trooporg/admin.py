@@ -32,6 +32,10 @@ class MemberAdmin(admin.ModelAdmin):
 
     list_display_links = ('first_name', 'last_name')
 
+    def get_queryset(self, request):
+        # Resolve the status of every listed member in a single query
+        return super().get_queryset(request).with_status()
+
     def is_adult_view(self, obj: Member) -> bool:
         return obj.is_adult
 
@@ -39,6 +43,8 @@ class MemberAdmin(admin.ModelAdmin):
 
     is_adult_view.short_description = 'Adult'
 
+    is_adult_view.admin_order_field = 'is_adult'
+
     def is_active_member_view(self, obj: Member) -> bool:
         return obj.is_active_member
 
@@ -46,6 +52,8 @@ class MemberAdmin(admin.ModelAdmin):
 
     is_active_member_view.short_description = 'Active Member'
 
+    is_active_member_view.admin_order_field = 'is_active_member'
+
 
 @admin.register(Term)
 class TermAdmin(admin.ModelAdmin):
@@ -11,3 +11,7 @@ class TroopOrgConfig(AppConfig):
     name = 'troop89.trooporg'
     label = 'trooporg'
     verbose_name = 'BSA Troop Organization'
+
+    def ready(self):
+        # Register signal receivers
+        from . import signals  # noqa: F401
@@ -0,0 +1,22 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from django.core.management.base import BaseCommand
+
+from troop89.trooporg.models import Member
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored adult status of every member from the positions "
+        "that they have held. The status is normally kept up to date as "
+        "positions change, but must be refreshed after positions are modified "
+        "in bulk."
+    )
+
+    def handle(self, *args, **options):
+        count = Member.objects.refresh_is_adult()
+        self.stdout.write(f"Refreshed the status of {count} members.")
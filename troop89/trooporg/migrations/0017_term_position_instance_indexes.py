@@ -0,0 +1,21 @@
+# Generated by Django 2.2.28 on 2026-10-17 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trooporg', '0016_auto_20180812_1710'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='positioninstance',
+            index=models.Index(fields=['term', 'type'], name='trooporg_po_term_id_3eb6a1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='term',
+            index=models.Index(fields=['start', 'end'], name='trooporg_te_start_eaf088_idx'),
+        ),
+    ]
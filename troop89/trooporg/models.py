@@ -4,21 +4,72 @@
 #  License, v. 2.0. If a copy of the MPL was not distributed with this
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import bisect
 import datetime
+from typing import List, Tuple
 
 from django.contrib import auth
+from django.contrib.auth.models import UserManager
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Case, Q, Value, When
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
 from django.shortcuts import reverse
+from django.utils import timezone
 from django.utils.functional import cached_property
 
+from troop89.cache import cached, expire_on_commit
+
+
+class MemberQuerySet(models.QuerySet):
+    """Query set for member instances."""
+
+    def with_status(self):
+        """
+        Annotate each member with their ``is_active_member`` status.
+
+        The annotation takes the place of the corresponding cached property
+        on Member instances, which would otherwise perform up to two queries
+        per member.
+        """
+        try:
+            current_term = Term.objects.current()
+        except Term.DoesNotExist:
+            return self.annotate(is_active_member=Value(False, output_field=models.BooleanField()))
+
+        current_positions = PositionInstance.objects.filter(incumbent=OuterRef('pk'), term=current_term)
+        current_memberships = PatrolMembership.objects.filter(scout=OuterRef('pk'), term=current_term)
+        return self.annotate(
+            has_current_position=Exists(current_positions),
+            has_current_membership=Exists(current_memberships),
+        ).annotate(is_active_member=Case(
+            When(Q(has_current_position=True) | Q(has_current_membership=True), then=Value(True)),
+            default=Value(False),
+            output_field=models.BooleanField(),
+        ))
+
+    def refresh_is_adult(self) -> int:
+        """
+        Update the stored ``is_adult`` flag of each member from the positions
+        that they have held.
+
+        Return the number of members that were updated.
+        """
+        adult_positions = PositionInstance.objects.filter(incumbent=OuterRef('pk'), type__is_adult=True)
+        return self.update(is_adult=Exists(adult_positions))
+
+
+class MemberManager(UserManager.from_queryset(MemberQuerySet)):
+    """Manager for member instances that retains the user helper methods."""
+    pass
+
 
 class Member(auth.get_user_model()):
     """
     A scouting member.
     """
 
+    objects = MemberManager()
+
     class Meta:
         proxy = True
 
@@ -31,6 +82,8 @@ class Member(auth.get_user_model()):
         """
         Return the proper display name for this member based on their
         youth/adult status.
+
+        The status is stored on the member, so no queries are performed.
         """
         if self.is_adult:
             return self.get_full_name()
@@ -42,16 +95,6 @@ class Member(auth.get_user_model()):
         last = self.last_name[:1]
         return f'{first} {last}.'
 
-    @cached_property
-    def is_adult(self) -> bool:
-        """
-        Return True if this member is an adult.
-
-        A member is considered to be an adult if they have held an adult
-        position in the troop.
-        """
-        return self.position_types.filter(is_adult=True).exists()
-
     @cached_property
     def is_active_member(self) -> bool:
         """Return True if this member is an active member of the troop."""
@@ -59,14 +102,51 @@ class Member(auth.get_user_model()):
 
 
 class TermManager(models.Manager):
+    # Terms are few and rarely change, so every term is cached together in a
+    # single index sorted by start date. See troop89.trooporg.signals for the
+    # cache invalidation logic. Since the signals only reach the cache of the
+    # process that changed a term, the index also expires after a while.
+    INDEX_CACHE_KEY = 'trooporg.term-index'
+    INDEX_CACHE_TIMEOUT = 5 * 60
+
     def current(self):
         """Return the term that overlaps with the current date."""
         today = datetime.date.today()
         return self.for_date(today)
 
     def for_date(self, date: datetime.date):
-        """Return the term that overlaps with the given date."""
-        return self.get_queryset().get(start__lte=date, end__gt=date)
+        """
+        Return the term that overlaps with the given date.
+
+        The term is resolved from the cached term index, so no queries are
+        performed unless the index needs to be rebuilt.
+        """
+        if isinstance(date, datetime.datetime):
+            # Mirror the conversion performed by DateField lookups
+            if timezone.is_aware(date):
+                date = timezone.make_naive(date, timezone.get_default_timezone())
+            date = date.date()
+
+        starts, terms = self.get_index()
+        # Terms may not overlap, so only the latest term starting on or
+        # before the date could possibly contain it.
+        position = bisect.bisect_right(starts, date) - 1
+        if position >= 0 and date < terms[position].end:
+            return terms[position]
+        raise self.model.DoesNotExist(f'No term overlaps with {date}.')
+
+    @cached(key=lambda manager: manager.INDEX_CACHE_KEY, timeout=INDEX_CACHE_TIMEOUT)
+    def get_index(self) -> Tuple[List[datetime.date], List['Term']]:
+        """
+        Return the sorted start dates of all terms along with the
+        corresponding terms.
+        """
+        terms = list(self.get_queryset().order_by('start'))
+        return [term.start for term in terms], terms
+
+    def clear_cache(self):
+        """Expire the cached term index, and again once the current transaction commits."""
+        expire_on_commit(self.INDEX_CACHE_KEY)
 
 
 class Term(models.Model):
@@ -81,6 +161,10 @@ class Term(models.Model):
     class Meta:
         ordering = ('-start',)
         get_latest_by = ('start',)
+        indexes = [
+            # Supports lookups of the term that overlaps with a date
+            models.Index(fields=['start', 'end']),
+        ]
 
     def __str__(self):
         period = self.period_str()
@@ -226,6 +310,10 @@ class PositionInstance(models.Model):
 
     class Meta:
         unique_together = ('incumbent', 'term', 'type')
+        indexes = [
+            # Supports lookups of the incumbents of a position during a term
+            models.Index(fields=['term', 'type']),
+        ]
 
     def __str__(self):
         name = self.incumbent.get_full_name()
@@ -0,0 +1,113 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Signal receivers that keep the trooporg app's caches and denormalized member
+statuses consistent with the database.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import utils
+from .models import Member, Patrol, PatrolMembership, PositionInstance, PositionType, Term
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+def clear_term_index(sender, **kwargs):
+    """Discard the cached term index whenever a term changes."""
+    Term.objects.clear_cache()
+
+
+@receiver(post_save, sender=Term)
+def invalidate_term_roster(sender, instance: Term, **kwargs):
+    """Discard the cached roster of a term that changed."""
+    utils.invalidate_rosters([instance.pk])
+
+
+@receiver(pre_save, sender=PositionInstance)
+def remember_previous_position(sender, instance: PositionInstance, raw=False, **kwargs):
+    """
+    Record the incumbent and term of a position before it is saved so that
+    they can be updated if the position is reassigned.
+    """
+    instance._previous_incumbent_id = None
+    instance._previous_term_id = None
+    if instance.pk is None or raw:
+        return
+    previous = PositionInstance.objects.filter(pk=instance.pk).values_list('incumbent_id', 'term_id').first()
+    if previous is not None:
+        instance._previous_incumbent_id, instance._previous_term_id = previous
+
+
+@receiver(post_save, sender=PositionInstance)
+@receiver(post_delete, sender=PositionInstance)
+def refresh_incumbent_is_adult(sender, instance: PositionInstance, **kwargs):
+    """Update the adult status of the incumbents of a position that changed."""
+    incumbents = {instance.incumbent_id, getattr(instance, '_previous_incumbent_id', None)}
+    members = Member.objects.filter(pk__in=incumbents - {None})
+
+    previous_statuses = dict(members.values_list('pk', 'is_adult'))
+    members.refresh_is_adult()
+    if dict(members.values_list('pk', 'is_adult')) != previous_statuses:
+        # The incumbents' names are displayed differently in every term
+        utils.invalidate_all_rosters()
+
+
+@receiver(post_save, sender=PositionInstance)
+@receiver(post_delete, sender=PositionInstance)
+def invalidate_position_rosters(sender, instance: PositionInstance, **kwargs):
+    """Discard the cached rosters of the terms of a position that changed."""
+    utils.invalidate_rosters([instance.term_id, getattr(instance, '_previous_term_id', None)])
+
+
+@receiver(pre_save, sender=PatrolMembership)
+def remember_previous_membership_term(sender, instance: PatrolMembership, raw=False, **kwargs):
+    """
+    Record the term of a patrol membership before it is saved so that its
+    roster can be invalidated if the membership is moved.
+    """
+    instance._previous_term_id = None
+    if instance.pk is None or raw:
+        return
+    instance._previous_term_id = PatrolMembership.objects \
+        .filter(pk=instance.pk) \
+        .values_list('term_id', flat=True) \
+        .first()
+
+
+@receiver(post_save, sender=PatrolMembership)
+@receiver(post_delete, sender=PatrolMembership)
+def invalidate_membership_rosters(sender, instance: PatrolMembership, **kwargs):
+    """Discard the cached rosters of the terms of a patrol membership that changed."""
+    utils.invalidate_rosters([instance.term_id, getattr(instance, '_previous_term_id', None)])
+
+
+@receiver(post_save, sender=PositionType)
+def refresh_position_type_is_adult(sender, instance: PositionType, raw=False, **kwargs):
+    """Update the adult status of every member who has held a position of the given type."""
+    if raw:
+        return
+    Member.objects.filter(position_instances__type=instance).refresh_is_adult()
+
+
+@receiver(post_save, sender=PositionType)
+@receiver(post_save, sender=Patrol)
+def invalidate_all_rosters(sender, **kwargs):
+    """Discard the cached roster of every term, all of which may list the changed object."""
+    utils.invalidate_all_rosters()
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_save, sender=get_user_model())
+def invalidate_member_rosters(sender, update_fields=None, **kwargs):
+    """Discard the cached roster of every term when a member's name may have changed."""
+    # Logging in only updates the last login time
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    utils.invalidate_all_rosters()
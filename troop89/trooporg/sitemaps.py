@@ -12,14 +12,16 @@ from .models import Patrol, Term
 class TermSitemap(Sitemap):
     changefreq = "never"
     priority = 0.4
+    limit = 1000
 
     def items(self):
-        return Term.objects.all()
+        return Term.objects.only('start')
 
 
 class PatrolSitemap(Sitemap):
     changefreq = "monthly"
     priority = 0.4
+    limit = 1000
 
     def items(self):
-        return Patrol.objects.all()
+        return Patrol.objects.only('slug').order_by('name')
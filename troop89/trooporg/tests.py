@@ -5,11 +5,17 @@
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import datetime
+from io import StringIO
+from unittest import mock
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-from .models import Term
+from . import utils
+from .models import Member, Patrol, PatrolMembership, PositionInstance, PositionType, Term
 
 
 class TermTest(TestCase):
@@ -103,3 +109,292 @@ class TermTest(TestCase):
             "Term start MUST occur before the term\'s end.",
             lambda: Term(start=self.TODAY, end=end).clean()
         )
+
+
+class TermForDateTest(TestCase):
+    TODAY = datetime.date(2018, 6, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        delta = datetime.timedelta(days=7)
+        cls.earlier = Term.objects.create(start=cls.TODAY - delta, end=cls.TODAY)
+        cls.later = Term.objects.create(start=cls.TODAY, end=cls.TODAY + delta)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_for_date_inside_term(self):
+        self.assertEqual(Term.objects.for_date(self.TODAY - datetime.timedelta(days=1)), self.earlier)
+
+    def test_for_date_on_shared_boundary_is_later_term(self):
+        self.assertEqual(Term.objects.for_date(self.TODAY), self.later)
+
+    def test_for_date_outside_terms(self):
+        with self.assertRaises(Term.DoesNotExist):
+            Term.objects.for_date(self.TODAY + datetime.timedelta(days=7))
+        with self.assertRaises(Term.DoesNotExist):
+            Term.objects.for_date(self.TODAY - datetime.timedelta(days=8))
+
+    def test_for_date_cached(self):
+        Term.objects.for_date(self.TODAY)
+        with self.assertNumQueries(0):
+            Term.objects.for_date(self.TODAY - datetime.timedelta(days=1))
+
+    def test_for_date_invalidated_on_save(self):
+        self.assertEqual(Term.objects.for_date(self.TODAY), self.later)
+        self.later.start = self.TODAY + datetime.timedelta(days=1)
+        self.later.save()
+
+        with self.assertRaises(Term.DoesNotExist):
+            Term.objects.for_date(self.TODAY)
+
+    def test_index_expires(self):
+        Term.objects.for_date(self.TODAY)
+        self.assertIsNotNone(cache.get(Term.objects.INDEX_CACHE_KEY).expires_at)
+
+    def test_index_expired_on_commit(self):
+        with mock.patch('troop89.cache.transaction.on_commit') as on_commit:
+            Term.objects.get(pk=self.later.pk).save()
+        # Another worker caches the index before the transaction commits
+        Term.objects.for_date(self.TODAY)
+        on_commit.call_args[0][0]()
+        with self.assertNumQueries(1):
+            Term.objects.for_date(self.TODAY)
+
+
+class MemberStatusTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = datetime.date.today()
+        delta = datetime.timedelta(days=7)
+        old_term = Term.objects.create(start=today - 3 * delta, end=today - 2 * delta)
+        current_term = Term.objects.create(start=today, end=today + delta)
+        adviser = PositionType.objects.create(title='Adviser', is_adult=True, is_leader=True)
+        patrol = Patrol.objects.create(name='Eagle', slug='eagle')
+
+        cls.adult = Member.objects.create_user('adult', first_name='Ada', last_name='Adult')
+        cls.scout = Member.objects.create_user('scout', first_name='Sam', last_name='Scout')
+        cls.alumnus = Member.objects.create_user('alumnus', first_name='Al', last_name='Alumnus')
+
+        PositionInstance.objects.create(incumbent=cls.adult, term=old_term, type=adviser)
+        PatrolMembership.objects.create(scout=cls.scout, patrol=patrol, term=current_term)
+        PatrolMembership.objects.create(scout=cls.alumnus, patrol=patrol, term=old_term)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_with_status_matches_properties(self):
+        members = Member.objects.with_status().order_by('username')
+        for annotated in members:
+            member = Member.objects.get(pk=annotated.pk)
+            self.assertEqual(annotated.is_adult, member.is_adult)
+            self.assertEqual(annotated.is_active_member, member.is_active_member)
+
+    def test_with_status_single_query(self):
+        Term.objects.current()  # Populate the term index
+        with self.assertNumQueries(1):
+            statuses = [(m.is_adult, m.is_active_member) for m in Member.objects.with_status().order_by('username')]
+        self.assertEqual(statuses, [(True, False), (False, False), (False, True)])
+
+
+class MemberIsAdultTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = datetime.date.today()
+        cls.term = Term.objects.create(start=today, end=today + datetime.timedelta(days=7))
+        cls.adviser = PositionType.objects.create(title='Adviser', is_adult=True, is_leader=True)
+        cls.scribe = PositionType.objects.create(title='Scribe', is_adult=False, is_leader=False)
+        cls.ada = Member.objects.create_user('ada', first_name='Ada', last_name='Adult')
+        cls.sam = Member.objects.create_user('sam', first_name='Sam', last_name='Scout')
+
+    def assertAdult(self, member, expected=True):
+        member.refresh_from_db()
+        self.assertEqual(member.is_adult, expected)
+
+    def test_position_created_and_deleted(self):
+        position = PositionInstance.objects.create(incumbent=self.ada, term=self.term, type=self.adviser)
+        self.assertAdult(self.ada)
+        position.delete()
+        self.assertAdult(self.ada, False)
+
+    def test_position_reassigned(self):
+        position = PositionInstance.objects.create(incumbent=self.ada, term=self.term, type=self.adviser)
+        position.incumbent = self.sam
+        position.save()
+        self.assertAdult(self.ada, False)
+        self.assertAdult(self.sam)
+
+    def test_position_type_changed(self):
+        PositionInstance.objects.create(incumbent=self.sam, term=self.term, type=self.scribe)
+        self.assertAdult(self.sam, False)
+        self.scribe.is_adult = True
+        self.scribe.save()
+        self.assertAdult(self.sam)
+
+    def test_safe_display_without_queries(self):
+        PositionInstance.objects.create(incumbent=self.ada, term=self.term, type=self.adviser)
+        ada, sam = Member.objects.order_by('username')
+        with self.assertNumQueries(0):
+            self.assertEqual(ada.get_safe_display(), 'Ada Adult')
+            self.assertEqual(sam.get_safe_display(), 'Sam S.')
+
+    def test_refresh_command(self):
+        PositionInstance.objects.create(incumbent=self.ada, term=self.term, type=self.adviser)
+        # Bulk updates bypass the signals that maintain the flag
+        Member.objects.update(is_adult=False)
+        call_command('refresh_member_status', stdout=StringIO())
+        self.assertAdult(self.ada)
+        self.assertAdult(self.sam, False)
+
+
+class FetchIncumbentsTest(TestCase):
+    TODAY = datetime.date(2018, 6, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        delta = datetime.timedelta(days=7)
+        cls.earlier = Term.objects.create(start=cls.TODAY - delta, end=cls.TODAY)
+        cls.later = Term.objects.create(start=cls.TODAY, end=cls.TODAY + delta)
+        cls.spl = PositionType.objects.create(title='SPL', is_adult=False, is_leader=True)
+        cls.aspl = PositionType.objects.create(title='ASPL', is_adult=False, is_leader=True)
+        cls.ann = Member.objects.create_user('ann', first_name='Ann', last_name='Able')
+        cls.bob = Member.objects.create_user('bob', first_name='Bob', last_name='Baker')
+        PositionInstance.objects.create(incumbent=cls.ann, term=cls.earlier, type=cls.spl)
+        PositionInstance.objects.create(incumbent=cls.bob, term=cls.later, type=cls.spl)
+        PositionInstance.objects.create(incumbent=cls.ann, term=cls.later, type=cls.aspl)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_incumbents_by_date(self):
+        earlier_date = self.TODAY - datetime.timedelta(days=1)
+        incumbents = utils.fetch_incumbents(['SPL', 'ASPL'], [earlier_date, self.TODAY])
+        self.assertDictEqual(incumbents, {
+            earlier_date: {'SPL': [self.ann], 'ASPL': []},
+            self.TODAY: {'SPL': [self.bob], 'ASPL': [self.ann]},
+        })
+
+    def test_date_outside_terms(self):
+        outside = self.TODAY + datetime.timedelta(days=30)
+        Term.objects.for_date(self.TODAY)
+        with self.assertNumQueries(0):
+            incumbents = utils.fetch_incumbents(['SPL'], [outside])
+        self.assertDictEqual(incumbents, {outside: {'SPL': []}})
+
+    def test_single_query(self):
+        # Warm the cached term index
+        Term.objects.for_date(self.TODAY)
+        with self.assertNumQueries(1):
+            incumbents = utils.fetch_incumbents(['SPL', 'ASPL'], [self.TODAY - datetime.timedelta(days=1), self.TODAY])
+            names = [m.get_safe_display() for titles in incumbents.values() for ms in titles.values() for m in ms]
+        self.assertCountEqual(names, ['Ann A.', 'Bob B.', 'Ann A.'])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class TermRosterSnapshotTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = datetime.date.today()
+        delta = datetime.timedelta(days=7)
+        cls.past_term = Term.objects.create(start=today - 3 * delta, end=today - 2 * delta)
+        cls.current_term = Term.objects.create(start=today, end=today + delta)
+        cls.patrol = Patrol.objects.create(name='Eagle', slug='eagle')
+        cls.scout = Member.objects.create_user('scout', first_name='Sam', last_name='Scout')
+
+    def setUp(self):
+        cache.clear()
+        self.past_membership = PatrolMembership.objects.create(
+            scout=self.scout, patrol=self.patrol, term=self.past_term,
+        )
+        self.current_membership = PatrolMembership.objects.create(
+            scout=self.scout, patrol=self.patrol, term=self.current_term,
+        )
+
+    def get_term(self, term):
+        return self.client.get(term.get_absolute_url())
+
+    def test_past_roster_cached(self):
+        self.get_term(self.past_term)
+        # Change the membership without invalidating the cached roster
+        PatrolMembership.objects.filter(pk=self.past_membership.pk).update(type=PatrolMembership.LEADER)
+        self.assertNotContains(self.get_term(self.past_term), 'Leader')
+
+    def test_past_roster_without_queries(self):
+        self.get_term(self.past_term)
+        with self.assertNumQueries(0):
+            self.get_term(self.past_term)
+
+    def test_past_roster_invalidated_on_membership_change(self):
+        self.get_term(self.past_term)
+        self.past_membership.type = PatrolMembership.LEADER
+        self.past_membership.save()
+        self.assertContains(self.get_term(self.past_term), 'Leader')
+
+    def test_past_roster_invalidated_on_member_change(self):
+        self.get_term(self.past_term)
+        self.scout.first_name = 'Samantha'
+        self.scout.save()
+        self.assertContains(self.get_term(self.past_term), 'Samantha S.')
+
+    def test_current_roster_live(self):
+        self.client.get(reverse('trooporg:current-term'))
+        PatrolMembership.objects.filter(pk=self.current_membership.pk).update(type=PatrolMembership.LEADER)
+        self.assertContains(self.client.get(reverse('trooporg:current-term')), 'Leader')
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, PREPEND_WWW=False)
+class PatrolDetailViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = datetime.date.today()
+        delta = datetime.timedelta(days=7)
+        cls.patrol = Patrol.objects.create(name='Eagle', slug='eagle')
+        cls.scouts = [Member.objects.create_user(f'scout{i}', first_name=f'Scout{i}', last_name='S') for i in range(3)]
+        cls.current_term = Term.objects.create(start=today, end=today + delta)
+        cls.past_terms = [
+            Term.objects.create(start=today - (i + 2) * delta, end=today - (i + 1) * delta)
+            for i in range(6)
+        ]
+        for scout in cls.scouts:
+            PatrolMembership.objects.create(scout=scout, patrol=cls.patrol, term=cls.current_term)
+        for term in cls.past_terms:
+            PatrolMembership.objects.create(scout=cls.scouts[0], patrol=cls.patrol, term=term)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, **params):
+        return self.client.get(self.patrol.get_absolute_url(), params)
+
+    def test_current_memberships(self):
+        response = self.get()
+        self.assertEqual(len(response.context['current_memberships']), 3)
+        self.assertEqual(response.context['current_term'], self.current_term)
+        self.assertEqual(response.context['member_count'], 9)
+
+    def test_past_terms_paginated(self):
+        first = self.get().context['term_rosters']
+        second = self.get(page=2).context['term_rosters']
+        self.assertListEqual(
+            [roster.term for roster in first + second],
+            self.past_terms,
+        )
+        self.assertTrue(all(roster.member_count == len(roster.memberships) == 1 for roster in first))
+
+    def test_queries_do_not_grow_with_history(self):
+        with self.assertNumQueries(3):
+            # The patrol, the member count of each term, and the memberships
+            # of the current term and of the term page.
+            self.get()
+
+    def test_term_missing_from_index(self):
+        Term.objects.get_index()
+        # Another process adds a term, which is missing from this process's index
+        start = self.past_terms[-1].start - datetime.timedelta(days=14)
+        Term.objects.bulk_create([Term(start=start, end=start + datetime.timedelta(days=7))])
+        new_term = Term.objects.get(start=start)
+        PatrolMembership.objects.create(scout=self.scouts[1], patrol=self.patrol, term=new_term)
+
+        response = self.get(page=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['term_rosters'][-1].term, new_term)
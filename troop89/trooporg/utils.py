@@ -0,0 +1,79 @@
+#  Copyright (c) 2019 Brian Schubert
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import collections
+import datetime
+from typing import Dict, Iterable, List, Sequence
+
+from troop89.cache import expire
+from .models import Member, PositionInstance, Term
+
+
+def is_past_term(term: Term) -> bool:
+    """Return True if the given term has ended."""
+    return term.end <= datetime.date.today()
+
+
+def roster_cache_key(term_pk: int) -> str:
+    """Return the cache key for the rendered roster of the term with the given key."""
+    return f'trooporg.roster.{term_pk}'
+
+
+def invalidate_rosters(term_pks: Iterable[int]):
+    """
+    Expire the cached rosters of the terms with the given keys.
+
+    The expired rosters may still be served while they are re-rendered.
+    """
+    keys = {roster_cache_key(pk) for pk in term_pks if pk is not None}
+    if keys:
+        expire(*keys)
+
+
+def invalidate_all_rosters():
+    """Expire the cached roster of every term."""
+    _, terms = Term.objects.get_index()
+    invalidate_rosters(term.pk for term in terms)
+
+
+def fetch_incumbents(position_titles: Sequence[str],
+                     dates: Iterable[datetime.date]) -> Dict[datetime.date, Dict[str, List[Member]]]:
+    """
+    Return the members who held each of the given positions during the terms
+    that contain each of the given dates.
+
+    The result maps each date to a dict from each position title to the
+    position's incumbents. Positions that were not held, or dates outside of
+    any term, map to empty lists.
+
+    The terms are resolved from the cached term index, so at most one query
+    is performed. Since members store their adult status, the returned
+    members may be displayed without further queries.
+    """
+    terms = {}
+    for date in set(dates):
+        try:
+            terms[date] = Term.objects.for_date(date)
+        except Term.DoesNotExist:
+            terms[date] = None
+
+    incumbents = collections.defaultdict(list)
+    term_pks = {term.pk for term in terms.values() if term is not None}
+    if term_pks and position_titles:
+        positions = PositionInstance.objects \
+            .filter(term__in=term_pks, type__title__in=position_titles) \
+            .select_related('incumbent', 'type') \
+            .order_by('incumbent__last_name', 'incumbent__first_name')
+        for position in positions:
+            incumbents[position.term_id, position.type.title].append(position.incumbent)
+
+    return {
+        date: {
+            title: incumbents[term.pk, title] if term is not None else []
+            for title in position_titles
+        }
+        for date, term in terms.items()
+    }
@@ -4,14 +4,20 @@
 #  License, v. 2.0. If a copy of the MPL was not distributed with this
 #  file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import collections
 import datetime
-from typing import List, Optional, Tuple
+from typing import List, NamedTuple, Optional
 
-from django.db.models import Prefetch
+from django.core.paginator import Paginator
+from django.db.models import Count
 from django.shortcuts import Http404
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 from django.views.generic import DetailView, ListView
 from django.views.generic.dates import DayMixin, MonthMixin, YearMixin
 
+from troop89.cache import cached
+from . import utils
 from .models import Patrol, PatrolMembership, PositionInstance, Term
 
 
@@ -22,27 +28,60 @@ class PatrolArchiveView(ListView):
 class PatrolDetailView(DetailView):
     model = Patrol
 
-    def get_queryset(self):
-        prefetch_memberships = Prefetch(
-            'memberships',
-            queryset=PatrolMembership.objects
-                .select_related('scout', 'term')
-                .order_by('-term__start', 'type')
-        )
-        return super().get_queryset().prefetch_related(prefetch_memberships)
+    # Number of past terms whose members are listed on each page
+    paginate_terms_by = 4
+
+    class TermRoster(NamedTuple):
+        term: Term
+        member_count: int
+        memberships: List[PatrolMembership]
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data()
-        # All memberships will be looped over in the template so its OK to
-        # resolve the query set now.
-        # Normally, the below filtering SHOULD be performed at the database level.
-        # However, since all the memberships for this patrol have already been
-        # fetched - along with their related fields - filtering in python was
-        # assumed to be more efficient.
-        current_memberships = [m for m in self.object.memberships.all() if m.term.is_current()]
+        context = super().get_context_data(**kwargs)
+        memberships = self.object.memberships.all()
+
+        # The member count of every term is small enough to fetch at once.
+        # The current term is found among them, rather than in the term
+        # index, so that the page does not depend on the index being fresh.
+        today = datetime.date.today()
+        current_term_pk = None
+        term_counts = []
+        context['member_count'] = 0
+        for term_pk, start, end, member_count in memberships \
+                .values_list('term', 'term__start', 'term__end') \
+                .annotate(member_count=Count('pk')) \
+                .order_by('-term__start'):
+            context['member_count'] += member_count
+            if start <= today < end:
+                current_term_pk = term_pk
+            else:
+                term_counts.append((term_pk, member_count))
+
+        # Only the memberships of the current term and of the past terms on
+        # the requested page are fetched, so the cost of the page does not
+        # grow with the patrol's history.
+        paginator = Paginator(term_counts, self.paginate_terms_by)
+        page = paginator.get_page(self.request.GET.get('page'))
+
+        memberships_by_term = collections.defaultdict(list)
+        for membership in memberships \
+                .filter(term__in=[current_term_pk] + [term_pk for term_pk, _ in page]) \
+                .select_related('scout', 'term') \
+                .order_by('type'):
+            memberships_by_term[membership.term_id].append(membership)
+
+        current_memberships = memberships_by_term.get(current_term_pk)
         if current_memberships:
             context['current_memberships'] = current_memberships
             context['current_term'] = current_memberships[0].term
+
+        context['term_page'] = page
+        context['term_rosters'] = [
+            self.TermRoster(memberships_by_term[term_pk][0].term, member_count, memberships_by_term[term_pk])
+            for term_pk, member_count in page
+            # Skip terms whose memberships were removed since they were counted
+            if memberships_by_term[term_pk]
+        ]
         return context
 
 
@@ -56,55 +95,62 @@ class BaseTermDetailView(DetailView):
     def get_object(self, queryset=None) -> Optional[Term]:
         self.date = self.get_date()
 
-        if queryset is None:
-            queryset = self.get_queryset()
-
-        # A plethora of prefetches to prevent a plethora of queries
-        prefetch_positions = Prefetch(
-            'position_instances',
-            # List youth positions first
-            queryset=PositionInstance.objects
-                .add_grouping_name()
-                .select_related('incumbent')
-                .order_by('type__is_adult', '-type__is_leader', '-type__precedence')
-        )
-        prefetch_memberships = Prefetch(
-            'patrol_memberships',
-            # Sort memberships by (patrol,type) for regroup tags
-            queryset=PatrolMembership
-                .objects
-                .select_related('scout', 'patrol')
-                .order_by('patrol__name', 'type')
-        )
-        queryset = queryset \
-            .prefetch_related(prefetch_positions) \
-            .prefetch_related(prefetch_memberships)
-
         try:
-            return queryset.get(start__lte=self.date, end__gt=self.date)
+            # Resolved from the cached term index
+            return Term.objects.for_date(self.date)
         except Term.DoesNotExist:
             return None  # todo: consider whether raising an Http404 would be more appropriate
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        top, bottom = self._partitioned_position_instances()
-        context['top_positions'] = top
-        context['bottom_positions'] = bottom
         context['date'] = self.date
+        if self.object:
+            # The rosters of past terms no longer change, so they are
+            # rendered once and served from the cache.
+            if utils.is_past_term(self.object):
+                roster = render_term_roster_snapshot(self.object)
+            else:
+                roster = render_term_roster(self.object)
+            context['roster'] = mark_safe(roster)
 
         return context
 
-    def _partitioned_position_instances(self) -> Tuple[List[PositionInstance], List[PositionInstance]]:
-        """Split this term's positions into two logical groups."""
-        top_positions, bottom_positions = [], []
-        if self.object:
-            for position in self.object.position_instances.all():
-                # Assume that type has been pre-selected
-                if not position.type.is_adult and position.type.is_leader:
-                    top_positions.append(position)
-                else:
-                    bottom_positions.append(position)
-        return top_positions, bottom_positions
+
+def render_term_roster(term: Term) -> str:
+    """Render the positions and patrol memberships of the given term."""
+    positions = PositionInstance.objects \
+        .filter(term=term) \
+        .add_grouping_name() \
+        .select_related('incumbent') \
+        .order_by('type__is_adult', '-type__is_leader', '-type__precedence')
+    memberships = PatrolMembership.objects \
+        .filter(term=term) \
+        .select_related('scout', 'patrol') \
+        .order_by('patrol__name', 'type')
+
+    # Split the term's positions into two logical groups
+    top_positions, bottom_positions = [], []
+    for position in positions:
+        if not position.type.is_adult and position.type.is_leader:
+            top_positions.append(position)
+        else:
+            bottom_positions.append(position)
+
+    return render_to_string('trooporg/includes/term-roster.html', {
+        'top_positions': top_positions,
+        'bottom_positions': bottom_positions,
+        # Sorted by (patrol, type) for regroup tags
+        'patrol_memberships': memberships,
+    })
+
+
+@cached(key=lambda term: utils.roster_cache_key(term.pk), timeout=None)
+def render_term_roster_snapshot(term: Term) -> str:
+    """
+    Render the roster of the given term and cache it until the term's
+    positions or memberships change.
+    """
+    return render_term_roster(term)
 
 
 class TermDetailView(YearMixin, MonthMixin, DayMixin, BaseTermDetailView):
@@ -22,19 +22,24 @@ Including another URLconf
 
 from django.conf import settings
 from django.contrib import admin
-from django.contrib.flatpages.sitemaps import FlatPageSitemap
-from django.contrib.sitemaps import views as sitemap_views
 from django.urls import include, path
 
-from troop89.announcements.sitemaps import AnnouncementSitemap
-from troop89.events.sitemaps import EventSitemap
+from troop89 import sitemaps as sitemap_views
+from troop89.announcements.utils import published_announcements_version
+from troop89.cache import cache_public_page
+from troop89.events.utils import events_last_modified
 from troop89.flatpages import views as flatpage_views
-from troop89.trooporg.sitemaps import PatrolSitemap, TermSitemap
 
 admin.site.site_title = settings.ADMIN_SITE_TITLE
 admin.site.site_header = settings.ADMIN_SITE_HEADER
 
 
+def _home_page_version() -> str:
+    # The home page shows the latest announcements and the upcoming events
+    return f'{published_announcements_version()}.{events_last_modified()}'
+
+
+@cache_public_page('home', timeout=5 * 60, get_version=_home_page_version)
 def maintenance_page(request):
     """Temporary view for rendering the maintenance page."""
     from django.db.models import Prefetch
@@ -52,14 +57,6 @@ def maintenance_page(request):
     return render(request, 'maintenance.html', context)
 
 
-sitemaps = {
-    'events': EventSitemap,
-    'announcements': AnnouncementSitemap,
-    'terms': TermSitemap,
-    'patrols': PatrolSitemap,
-    'flatpages': FlatPageSitemap,
-}
-
 urlpatterns = [
     path('', maintenance_page, name='home'),
     path('calendar/', include('troop89.events.urls', namespace='events')),
@@ -82,9 +79,15 @@ urlpatterns = [
     ),
     path(
         'sitemap.xml',
+        sitemap_views.index,
+        {'sitemaps': sitemap_views.sitemaps, 'sitemap_url_name': 'sitemap-section'},
+        name='sitemap-index',
+    ),
+    path(
+        'sitemap-<section>.xml',
         sitemap_views.sitemap,
-        {'sitemaps': sitemaps},
-        name='django.contrib.sitemaps.views.sitemap',
+        {'sitemaps': sitemap_views.sitemaps},
+        name='sitemap-section',
     ),
 ]
 